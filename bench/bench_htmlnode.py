@@ -0,0 +1,87 @@
+"""
+Compare the iterative HTMLNode renderer against a recursive reference.
+
+Usage:
+    python bench/bench_htmlnode.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from htmlnode import LeafNode, ParentNode
+
+
+def recursive_to_html(node):
+    """Reference renderer: the recursive ParentNode.to_html this repo used to ship."""
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    children_html = ""
+    for child in node.children:
+        children_html += recursive_to_html(child)
+    return f"<{node.tag}{node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def build_wide_tree(paragraphs=2000, leaves=20):
+    """A document with many shallow paragraphs, like a long blog post."""
+    children = []
+    for i in range(paragraphs):
+        inline = [LeafNode(None, f"text {i} {j} ") for j in range(leaves)]
+        inline.append(LeafNode("a", "link", {"href": f"/page/{i}"}))
+        children.append(ParentNode("p", inline))
+    return ParentNode("div", children)
+
+
+def build_deep_tree(depth=500, copies=200):
+    """Many deeply nested list chains, like generated nested lists/quotes."""
+    chains = []
+    for _ in range(copies):
+        node = LeafNode("b", "leaf")
+        for _ in range(depth):
+            node = ParentNode("li", [ParentNode("ul", [node])])
+        chains.append(node)
+    return ParentNode("div", chains)
+
+
+def time_render(render, node, repeat=5):
+    """Return (best seconds, output length) over several runs."""
+    best = None
+    length = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        html = render(node)
+        elapsed = time.perf_counter() - start
+        length = len(html)
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, length
+
+
+def main():
+    # The recursive reference needs headroom for the deep tree
+    sys.setrecursionlimit(10000)
+
+    trees = [
+        ("wide", build_wide_tree()),
+        ("deep", build_deep_tree()),
+        ("deeper", build_deep_tree(depth=20000, copies=1)),
+    ]
+
+    print(f"{'tree':<6} {'renderer':<10} {'seconds':>9} {'MB/s':>9}")
+    for name, tree in trees:
+        try:
+            if recursive_to_html(tree) != tree.to_html():
+                raise AssertionError(f"Renderers disagree on the {name} tree")
+        except RecursionError:
+            print(f"{name:<6} {'recursive':<10} {'RecursionError':>19}")
+            renderers = (("iterative", ParentNode.to_html),)
+        else:
+            renderers = (("recursive", recursive_to_html), ("iterative", ParentNode.to_html))
+        for label, render in renderers:
+            seconds, length = time_render(render, tree)
+            print(f"{name:<6} {label:<10} {seconds:>9.4f} {length / seconds / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
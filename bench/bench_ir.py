@@ -0,0 +1,64 @@
+"""
+Compare the HTMLNode tree with the flat HTMLDocument for a large page:
+objects allocated, memory retained and render time.
+
+Usage:
+    python bench/bench_ir.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from markdown_blocks import markdown_to_document, markdown_to_html_node
+
+
+def build_markdown(sections=500):
+    """A long page mixing every block type."""
+    parts = ["# Large page"]
+    for i in range(sections):
+        parts.append(f"## Section {i}")
+        parts.append(f"Paragraph {i} with **bold**, _italic_, `code` and a [link](/page/{i}).")
+        parts.append("\n".join(f"- item {j} of list {i}" for j in range(10)))
+        parts.append(f"> Quote {i}")
+    return "\n\n".join(parts)
+
+
+def measure(convert, markdown):
+    """Return (blocks retained, bytes retained, seconds to build and render)."""
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = convert(markdown, "/")
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, "filename")
+    blocks = sum(stat.count_diff for stat in stats)
+    size = sum(stat.size_diff for stat in stats)
+
+    start = time.perf_counter()
+    html = convert(markdown, "/").to_html()
+    seconds = time.perf_counter() - start
+    del result
+    return blocks, size, seconds, html
+
+
+def main():
+    markdown = build_markdown()
+    print(f"markdown: {len(markdown) / 1e6:.2f} MB")
+    print(f"{'representation':<15} {'objects':>9} {'KB':>9} {'seconds':>9}")
+
+    outputs = []
+    for name, convert in (("HTMLNode tree", markdown_to_html_node), ("HTMLDocument", markdown_to_document)):
+        blocks, size, seconds, html = measure(convert, markdown)
+        outputs.append(html)
+        print(f"{name:<15} {blocks:>9} {size / 1024:>9.0f} {seconds:>9.4f}")
+
+    if outputs[0] != outputs[1]:
+        raise AssertionError("Representations render different HTML")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Measure memory per node for the slotted node classes against
+equivalent classes that keep a per-instance __dict__.
+
+Usage:
+    python bench/bench_memory.py
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+
+class DictTextNode:
+    """TextNode as it was before __slots__."""
+
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictHTMLNode:
+    """HTMLNode as it was before __slots__."""
+
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+def bytes_per_node(factory, count=100000):
+    """Return the average number of bytes allocated per node."""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Subtract the list holding the nodes
+    return (after - before - sys.getsizeof(nodes)) / len(nodes)
+
+
+def main():
+    # Field values are shared, so only the node objects themselves are measured
+    children = []
+    cases = [
+        ("TextNode", lambda: DictTextNode("text", TextType.TEXT), lambda: TextNode("text", TextType.TEXT)),
+        ("LeafNode", lambda: DictHTMLNode("b", "text"), lambda: LeafNode("b", "text")),
+        ("ParentNode", lambda: DictHTMLNode("p", None, children), lambda: ParentNode("p", children)),
+    ]
+
+    print(f"{'node':<11} {'__dict__':>10} {'__slots__':>10} {'saved':>7}")
+    for name, dict_factory, slots_factory in cases:
+        dict_bytes = bytes_per_node(dict_factory)
+        slots_bytes = bytes_per_node(slots_factory)
+        saved = 1 - slots_bytes / dict_bytes
+        print(f"{name:<11} {dict_bytes:>10.1f} {slots_bytes:>10.1f} {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Measure parser and build throughput on synthetic corpora, and compare
+against a saved baseline.
+
+Cases:
+    inline/<kind>     text_to_textnodes on every block of a page
+    parse/<kind>      markdown_to_html_node on a page
+    render/<kind>     to_html on an already parsed page
+    build/<tree>      generate_pages_recursive on a content tree
+    copy/static       copy_directory_recursive of a static asset tree into an
+                      empty directory
+    sync/static       sync_directory of an unchanged static asset tree over
+                      an existing copy (the incremental build case)
+
+Usage:
+    python bench/bench_throughput.py [--scale 1.0] [--repeat 3]
+    python bench/bench_throughput.py --save baseline.json
+    python bench/bench_throughput.py --compare baseline.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from copy_static import copy_directory_recursive, sync_directory
+from generate_page import generate_pages_recursive
+from markdown_blocks import markdown_to_blocks, markdown_to_html_node
+from split_nodes import text_to_textnodes
+
+from corpus import PAGE_KINDS, write_content_tree, write_static_tree, write_template
+
+
+def best_time(function, repeat, setup=None):
+    """
+    Return the fastest of `repeat` runs of function(), in seconds.
+
+    setup(), if given, is called before each run and is not timed.
+    """
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def result(seconds, items, size):
+    return {
+        "seconds": seconds,
+        "items_per_sec": items / seconds,
+        "mb_per_sec": size / 1e6 / seconds,
+    }
+
+
+def bench_parser(scale, repeat):
+    """Yield (name, result) for the inline, parse and render cases of every page kind."""
+    rng = random.Random(0)
+    for kind, make_page in PAGE_KINDS.items():
+        markdown = "\n\n".join(make_page(rng) for _ in range(max(1, int(20 * scale))))
+        size = len(markdown.encode("utf-8"))
+        blocks = markdown_to_blocks(markdown)
+
+        def inline():
+            for block in blocks:
+                text_to_textnodes(block)
+
+        yield f"inline/{kind}", result(best_time(inline, repeat), len(blocks), size)
+        yield f"parse/{kind}", result(best_time(lambda: markdown_to_html_node(markdown), repeat), 1, size)
+        node = markdown_to_html_node(markdown)
+        yield f"render/{kind}", result(best_time(node.to_html, repeat), 1, size)
+
+
+def bench_build(scale, repeat, work_dir):
+    """Yield (name, result) for full page builds of a flat and a deep content tree."""
+    template_path = os.path.join(work_dir, "template.html")
+    write_template(template_path)
+    pages = max(1, int(200 * scale))
+
+    for name, depth in (("flat", 0), ("deep", 6)):
+        content_dir = os.path.join(work_dir, f"content_{name}")
+        dest_dir = os.path.join(work_dir, f"docs_{name}")
+        size = write_content_tree(content_dir, "mixed", pages, depth)
+
+        def build():
+            generate_pages_recursive(content_dir, template_path, dest_dir)
+
+        yield f"build/{name}", result(best_time(build, repeat), pages, size)
+
+
+def bench_copy(scale, repeat, work_dir):
+    """Yield (name, result) for copying and syncing a static asset tree."""
+    files = max(1, int(2000 * scale))
+    static_dir = os.path.join(work_dir, "static")
+    dest_dir = os.path.join(work_dir, "static_copy")
+    size = write_static_tree(static_dir, files, size=8192, depth=3)
+
+    # copy_directory_recursive only copies files that differ, so every run
+    # starts from an empty destination to time a full copy
+    def remove_copy():
+        if os.path.exists(dest_dir):
+            shutil.rmtree(dest_dir)
+
+    def copy():
+        copy_directory_recursive(static_dir, dest_dir)
+
+    def sync():
+        sync_directory(static_dir, dest_dir)
+
+    yield "copy/static", result(best_time(copy, repeat, remove_copy), files, size)
+    yield "sync/static", result(best_time(sync, repeat), files, size)
+
+
+def compare(results, baseline):
+    """Return {name: relative change in throughput} for cases in both runs."""
+    return {
+        name: results[name]["mb_per_sec"] / baseline[name]["mb_per_sec"] - 1
+        for name in results
+        if name in baseline
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parser and build throughput.")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply corpus sizes (default: 1.0)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best is kept (default: 3)")
+    parser.add_argument("--save", metavar="FILE", help="save the results as a baseline")
+    parser.add_argument("--compare", metavar="FILE", help="compare against a saved baseline")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    results = {}
+    work_dir = tempfile.mkdtemp(prefix="bench_throughput_")
+    header = f"{'case':<18} {'seconds':>9} {'items/s':>10} {'MB/s':>8}"
+    print(header + (f" {'vs base':>8}" if baseline else ""))
+    try:
+        cases = (
+            bench_parser(args.scale, args.repeat),
+            bench_build(args.scale, args.repeat, work_dir),
+            bench_copy(args.scale, args.repeat, work_dir),
+        )
+        for case in cases:
+            for name, measured in case:
+                results[name] = measured
+                line = (
+                    f"{name:<18} {measured['seconds']:>9.4f} "
+                    f"{measured['items_per_sec']:>10.1f} {measured['mb_per_sec']:>8.2f}"
+                )
+                if baseline and name in baseline:
+                    line += f" {compare({name: measured}, baseline)[name]:>+8.1%}"
+                print(line)
+    finally:
+        shutil.rmtree(work_dir)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"scale": args.scale, "results": results}, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
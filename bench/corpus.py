@@ -0,0 +1,165 @@
+"""
+Generate synthetic markdown corpora and static asset trees for the
+benchmarks. Output is deterministic for a given seed.
+
+Usage:
+    python bench/corpus.py OUTPUT_DIR [--kind paragraphs] [--pages 1000] [--depth 3]
+"""
+import argparse
+import os
+import random
+
+
+WORDS = (
+    "the quick brown fox jumps over lazy dog ring of power shire hobbit wizard "
+    "mountain river forest elven king road journey shadow light tower gate"
+).split()
+
+
+def _sentence(rng, words=12):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _inline(rng, words=12):
+    """A sentence with some bold, italic and code spans."""
+    parts = _sentence(rng, words).split()
+    for style in ("**{}**", "_{}_", "`{}`"):
+        i = rng.randrange(len(parts))
+        parts[i] = style.format(parts[i])
+    return " ".join(parts)
+
+
+def paragraph_page(rng, blocks=40):
+    """Mostly long paragraphs with light inline formatting."""
+    parts = [f"# {_sentence(rng, 4)}"]
+    for i in range(blocks):
+        if i % 10 == 0:
+            parts.append(f"## {_sentence(rng, 3)}")
+        parts.append(" ".join(_inline(rng) for _ in range(5)))
+    return "\n\n".join(parts)
+
+
+def link_page(rng, blocks=40):
+    """Paragraphs dense with links and images."""
+    parts = [f"# {_sentence(rng, 4)}"]
+    for i in range(blocks):
+        sentence = []
+        for j in range(8):
+            word = rng.choice(WORDS)
+            if j % 3 == 0:
+                sentence.append(f"![{word}](/images/{word}{i}.png)")
+            else:
+                sentence.append(f"[{word}](/{word}/{i}/{j})")
+            sentence.append(rng.choice(WORDS))
+        parts.append(" ".join(sentence))
+    return "\n\n".join(parts)
+
+
+def list_page(rng, blocks=40):
+    """Ordered and unordered lists of short items."""
+    parts = [f"# {_sentence(rng, 4)}"]
+    for i in range(blocks):
+        if i % 2:
+            parts.append("\n".join(f"- {_inline(rng, 6)}" for _ in range(10)))
+        else:
+            parts.append("\n".join(f"{n}. {_inline(rng, 6)}" for n in range(1, 11)))
+    return "\n\n".join(parts)
+
+
+def code_page(rng, blocks=40):
+    """Code blocks between short paragraphs."""
+    parts = [f"# {_sentence(rng, 4)}"]
+    for i in range(blocks):
+        parts.append(_sentence(rng))
+        code = "\n".join(f"    {rng.choice(WORDS)} = {rng.choice(WORDS)}({i}, {n})" for n in range(15))
+        parts.append(f"```\ndef block_{i}():\n{code}\n```")
+    return "\n\n".join(parts)
+
+
+PAGE_KINDS = {
+    "paragraphs": paragraph_page,
+    "links": link_page,
+    "lists": list_page,
+    "code": code_page,
+}
+
+
+def _nested_dir(root, index, depth, fanout=4):
+    """Spread files over a tree of directories `depth` levels deep."""
+    parts = [root]
+    for level in range(depth):
+        parts.append(f"d{level}_{(index // fanout ** level) % fanout}")
+    return os.path.join(*parts)
+
+
+def write_content_tree(root, kind="paragraphs", pages=100, depth=0, seed=0):
+    """
+    Write a tree of markdown pages.
+
+    Args:
+        root (str): Content directory to create
+        kind (str): One of PAGE_KINDS, or "mixed" to cycle through them
+        pages (int): Number of pages
+        depth (int): Directory levels between root and each page
+        seed (int): Random seed
+
+    Returns:
+        int: Total bytes written
+    """
+    rng = random.Random(seed)
+    kinds = list(PAGE_KINDS.values()) if kind == "mixed" else [PAGE_KINDS[kind]]
+    total = 0
+    for i in range(pages):
+        directory = _nested_dir(root, i, depth)
+        os.makedirs(directory, exist_ok=True)
+        data = kinds[i % len(kinds)](rng).encode("utf-8")
+        with open(os.path.join(directory, f"page{i}.md"), "wb") as f:
+            f.write(data)
+        total += len(data)
+    return total
+
+
+def write_static_tree(root, files=1000, size=4096, depth=2, seed=0):
+    """
+    Write a tree of binary static assets.
+
+    Returns:
+        int: Total bytes written
+    """
+    rng = random.Random(seed)
+    for i in range(files):
+        directory = _nested_dir(root, i, depth)
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"asset{i}.bin"), "wb") as f:
+            f.write(rng.randbytes(size))
+    return files * size
+
+
+def write_template(path):
+    """Write a template like the site's own."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            "<!doctype html>\n<html>\n<head><title>{{ Title }}</title>"
+            '<link href="/index.css" rel="stylesheet" /></head>\n'
+            "<body><article>{{ Content }}</article></body>\n</html>\n"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic markdown corpus.")
+    parser.add_argument("output", help="directory to write content/, static/ and template.html into")
+    parser.add_argument("--kind", choices=[*PAGE_KINDS, "mixed"], default="mixed")
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--depth", type=int, default=2)
+    parser.add_argument("--static-files", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    content = write_content_tree(os.path.join(args.output, "content"), args.kind, args.pages, args.depth, args.seed)
+    static = write_static_tree(os.path.join(args.output, "static"), args.static_files, seed=args.seed)
+    write_template(os.path.join(args.output, "template.html"))
+    print(f"{args.pages} pages ({content / 1e6:.1f} MB), {args.static_files} static files ({static / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import hashlib
+import os
+from collections import OrderedDict
+
+
+# Part of every cache key; bump it when block rendering changes so stale
+# fragments in an on-disk cache are never reused
+BLOCK_CACHE_VERSION = 2
+
+
+class BlockCache:
+    """
+    A content-addressed cache of rendered block HTML.
+
+    Fragments are keyed by a hash of the block type, base path, asset map
+    digest and block text, so identical blocks (shared footers, callouts, repeated code
+    samples) are only parsed and rendered once. The most recently used
+    fragments are kept in memory, bounded by max_entries; with a cache_dir
+    they are also stored on disk and shared between builds and worker
+    processes.
+    """
+
+    def __init__(self, max_entries=4096, cache_dir=None):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        # Entries held by the caches of worker processes, by process id
+        self._worker_entries = {}
+
+    @staticmethod
+    def block_key(block_type, lines, basepath, asset_digest=""):
+        """Return the cache key for a block given as a list of lines."""
+        digest = hashlib.sha256(
+            f"{BLOCK_CACHE_VERSION}\0{block_type.value}\0{basepath}\0{asset_digest}\0".encode("utf-8")
+        )
+        digest.update("\n".join(lines).encode("utf-8"))
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".html")
+
+    def _read_disk(self, key):
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_disk(self, key, html):
+        path = self._disk_path(key)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            os.makedirs(directory, exist_ok=True)
+        # Unique per process, so parallel workers never share a temp file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(html)
+        os.replace(tmp_path, path)
+
+    def _remember(self, key, html):
+        entries = self._entries
+        entries[key] = html
+        if len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def render(self, block_type, lines, basepath, render_block, asset_map=None):
+        """
+        Return the HTML for a block, rendering it only on a cache miss.
+
+        Args:
+            block_type (BlockType): The type of the block
+            lines (list): The lines of the block
+            basepath (str): Base path the block's URLs are rendered with
+            render_block (callable): render_block(block_type, lines, basepath,
+                                     asset_map) returns the HTML for the block
+            asset_map (AssetMap): Fingerprinted asset URLs the block's URLs
+                                  are rendered with (default: None)
+
+        Returns:
+            str: The rendered HTML fragment
+        """
+        key = self.block_key(block_type, lines, basepath, asset_map.digest if asset_map else "")
+        entries = self._entries
+
+        html = entries.get(key)
+        if html is not None:
+            entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+        if self.cache_dir is not None:
+            html = self._read_disk(key)
+            if html is not None:
+                self.disk_hits += 1
+                self._remember(key, html)
+                return html
+
+        self.misses += 1
+        html = render_block(block_type, lines, basepath, asset_map)
+        self._remember(key, html)
+        if self.cache_dir is not None:
+            self._write_disk(key, html)
+        return html
+
+    def counts(self):
+        """Return (hits, disk_hits, misses)."""
+        return self.hits, self.disk_hits, self.misses
+
+    def add_counts(self, counts):
+        """Add counts reported by another cache, e.g. one in a worker process."""
+        hits, disk_hits, misses = counts
+        self.hits += hits
+        self.disk_hits += disk_hits
+        self.misses += misses
+
+    def set_worker_entries(self, worker, entries):
+        """Record the number of entries in the cache of a worker process."""
+        self._worker_entries[worker] = entries
+
+    @property
+    def lookups(self):
+        return self.hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups served from memory or disk (0.0 with no lookups)."""
+        if not self.lookups:
+            return 0.0
+        return (self.hits + self.disk_hits) / self.lookups
+
+    def summary(self):
+        """
+        Return a one-line description of the cache statistics.
+
+        When worker processes reported their caches, their entries are
+        counted instead, against the max_entries each of them holds.
+        """
+        if self._worker_entries:
+            workers = len(self._worker_entries)
+            entries = (
+                f"{sum(self._worker_entries.values())}/{workers * self.max_entries} entries "
+                f"in {workers} worker(s)"
+            )
+        else:
+            entries = f"{len(self._entries)}/{self.max_entries} entries"
+        text = (
+            f"Block cache: {self.hits} hit(s), {self.misses} miss(es), "
+            f"{self.hit_rate:.1%} hit rate, {entries}"
+        )
+        if self.cache_dir is not None:
+            text += f", {self.disk_hits} disk hit(s)"
+        return text
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return f"BlockCache({len(self._entries)}/{self.max_entries}, {self.cache_dir})"
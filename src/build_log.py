@@ -0,0 +1,116 @@
+import logging
+import sys
+import threading
+import time
+
+
+# Parent of every logger in the generator, so a single call configures them all
+LOGGER_NAME = "statichtml"
+
+# Seconds between progress lines, and between flushes of buffered output
+PROGRESS_INTERVAL = 1.0
+FLUSH_INTERVAL = 1.0
+
+# Messages are dropped until configure_logging is called, e.g. in tests or
+# when the modules are used as a library
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+
+def get_logger(name):
+    """Return the logger for a module of the generator."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """
+    A stream handler that does not flush after every message.
+
+    The stream is flushed for warnings and errors, and otherwise at most
+    once per FLUSH_INTERVAL, so thousands of log lines cost a handful of
+    writes to the terminal or CI log rather than one each. Buffered lines
+    are flushed by a timer at the end of the interval, so a message is
+    never held back when no further message follows, e.g. while the
+    server waits for requests.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(stream)
+        self._last_flush = time.monotonic()
+        self._timer = None
+
+    def emit(self, record):
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+        except Exception:
+            self.handleError(record)
+            return
+
+        now = time.monotonic()
+        if record.levelno >= logging.WARNING or now - self._last_flush >= FLUSH_INTERVAL:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(FLUSH_INTERVAL - (now - self._last_flush), self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        self.acquire()
+        try:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._last_flush = time.monotonic()
+            super().flush()
+        finally:
+            self.release()
+
+    def close(self):
+        self.flush()
+        super().close()
+
+
+def configure_logging(level=logging.INFO, stream=None):
+    """
+    Send the generator's log messages to a stream (default: stdout).
+
+    Args:
+        level (int): Minimum level to show; logging.WARNING for --quiet,
+                     logging.DEBUG to list every file (default: logging.INFO)
+        stream: Text stream to write to (default: sys.stdout)
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if not isinstance(handler, logging.NullHandler):
+            logger.removeHandler(handler)
+            handler.flush()
+
+    handler = BufferedStreamHandler(stream if stream is not None else sys.stdout)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    # The root logger's handlers, if any, would print every message twice
+    logger.propagate = False
+
+
+class ProgressCounter:
+    """
+    Log "<label> N/total" at most once per PROGRESS_INTERVAL.
+
+    Short builds finish before the first progress line, so they only show
+    their summary.
+    """
+
+    def __init__(self, logger, total, label, interval=PROGRESS_INTERVAL):
+        self.logger = logger
+        self.total = total
+        self.label = label
+        self.interval = interval
+        self.count = 0
+        self._next_report = time.monotonic() + interval
+
+    def advance(self, count=1):
+        self.count += count
+        now = time.monotonic()
+        if now >= self._next_report:
+            self._next_report = now + self.interval
+            self.logger.info("%s %d/%d", self.label, self.count, self.total)
@@ -0,0 +1,185 @@
+import json
+import os
+import threading
+
+from output_files import file_digest, write_if_changed
+
+
+CHANGE_MANIFEST_VERSION = 1
+
+
+class OutputRecorder:
+    """
+    Record the content hash of every file a build writes or keeps.
+
+    Pages and static files are recorded as the build produces them, so the
+    changes can be worked out without a second walk over the output tree.
+    A file is only read to hash it when its hash is not already known:
+    writers pass the hash they computed, and files whose size and mtime
+    match the previous build reuse the hash recorded then.
+
+    Recording is thread-safe, for the writer thread of a pipelined build.
+    """
+
+    def __init__(self, root=None, previous=None):
+        """
+        Args:
+            root (str): Directory that recorded paths are made relative to
+                        (default: None, keep paths as given, e.g. in a worker
+                        process whose records are merged into the parent's)
+            previous (dict): Files recorded by the previous build, from
+                             load_change_manifest (default: None)
+        """
+        self.root = root
+        self.previous = previous or {}
+        self.files = {}
+        self._lock = threading.Lock()
+
+    def _key(self, path):
+        if self.root is None:
+            return path
+        return os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def record(self, path, digest=None, source_path=None, source_sha256=None):
+        """
+        Record an output file as part of this build.
+
+        Args:
+            path (str): Path of the output file
+            digest (str): Hex sha256 of its content, if known (default: None)
+            source_path (str): File the output was found identical to, such
+                               as the static file it is a copy of. If their
+                               mtimes differ, the source's size and mtime are
+                               recorded too, for matches_source (default: None)
+            source_sha256 (str): Hex sha256 of the file the output was made
+                                 from, such as the source of a compressed
+                                 sibling (default: None)
+
+        Returns:
+            str: The hex sha256 recorded for the file
+        """
+        key = self._key(path)
+        stat = os.stat(path)
+        if digest is None:
+            entry = self.previous.get(key)
+            if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                digest = entry["sha256"]
+            else:
+                digest = file_digest(path)
+        entry = {"sha256": digest, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        if source_path is not None:
+            source_stat = os.stat(source_path)
+            if source_stat.st_mtime_ns != stat.st_mtime_ns:
+                entry["source_size"] = source_stat.st_size
+                entry["source_mtime_ns"] = source_stat.st_mtime_ns
+        if source_sha256 is not None:
+            entry["source_sha256"] = source_sha256
+        with self._lock:
+            self.files[key] = entry
+        return digest
+
+    def digest(self, path):
+        """Return the hash recorded for a file in this build, or None."""
+        entry = self.files.get(self._key(path))
+        return entry["sha256"] if entry is not None else None
+
+    def previous_entry(self, path):
+        """Return the previous build's record of a file, or None."""
+        return self.previous.get(self._key(path))
+
+    def matches_source(self, path, stat, source_stat):
+        """
+        Check whether the previous build found an output identical to a
+        source file with a different mtime, and neither file changed since.
+
+        Args:
+            path (str): Path of the output file
+            stat (os.stat_result): Its current stat
+            source_stat (os.stat_result): Current stat of the source file
+
+        Returns:
+            bool: True if both sizes and mtimes are as recorded then
+        """
+        entry = self.previous.get(self._key(path))
+        return (
+            entry is not None
+            and "source_mtime_ns" in entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+            and entry["source_size"] == source_stat.st_size
+            and entry["source_mtime_ns"] == source_stat.st_mtime_ns
+        )
+
+    def merge(self, files):
+        """Add the files recorded by another recorder, such as a worker process's."""
+        with self._lock:
+            for path, entry in files.items():
+                self.files[self._key(path)] = entry
+
+    def changes(self):
+        """
+        Compare this build's files against the previous build's.
+
+        Returns:
+            dict: "added", "modified" and "deleted" lists of {"path", "sha256"}
+                  dicts, sorted by path; deleted files carry their last hash
+        """
+        added = []
+        modified = []
+        for path in sorted(self.files):
+            digest = self.files[path]["sha256"]
+            entry = self.previous.get(path)
+            if entry is None:
+                added.append({"path": path, "sha256": digest})
+            elif entry["sha256"] != digest:
+                modified.append({"path": path, "sha256": digest})
+        deleted = [
+            {"path": path, "sha256": self.previous[path]["sha256"]}
+            for path in sorted(self.previous)
+            if path not in self.files
+        ]
+        return {"added": added, "modified": modified, "deleted": deleted}
+
+
+def load_change_manifest(manifest_path):
+    """
+    Load the files recorded by the previous build.
+
+    Args:
+        manifest_path (str): Path to the change manifest JSON file
+
+    Returns:
+        dict: Mapping of output path (relative to the output directory) to
+              its "sha256", "size" and "mtime_ns". Empty if the manifest is
+              missing, unreadable or from an older manifest version, in
+              which case every file of the next build counts as added.
+    """
+    if manifest_path is None or not os.path.exists(manifest_path):
+        return {}
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if data.get("version") != CHANGE_MANIFEST_VERSION:
+        return {}
+    return data.get("files", {})
+
+
+def save_change_manifest(manifest_path, files, changes):
+    """
+    Atomically write the changes of a build and its files to disk.
+
+    The "added", "modified" and "deleted" lists are what a deploy step
+    uploads and purges; "files" is the state the next build compares
+    against.
+
+    Args:
+        manifest_path (str): Path to the change manifest JSON file
+        files (dict): OutputRecorder.files of the build
+        changes (dict): OutputRecorder.changes() of the build
+    """
+    data = {"version": CHANGE_MANIFEST_VERSION, **changes, "files": files}
+    write_if_changed(manifest_path, json.dumps(data, indent=1, sort_keys=True))
@@ -1,58 +1,386 @@
+import errno
+import hashlib
+import json
 import os
 import shutil
+from collections.abc import Mapping
 
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
 
-def copy_directory_recursive(source_dir, dest_dir):
+from build_log import get_logger
+from output_files import file_digest, temp_path
+
+
+logger = get_logger(__name__)
+
+
+# Ways of materializing a static file in the destination directory
+COPY_MODES = ("copy", "hardlink", "reflink", "auto")
+
+# Hex digits of the content hash put in fingerprinted asset names
+FINGERPRINT_LENGTH = 10
+
+# Files that are never fingerprinted: pages are fetched by their own URL
+_UNFINGERPRINTED_EXTENSIONS = (".html", ".htm")
+
+
+def _is_fingerprinted(file):
+    """
+    Check whether a static file gets a fingerprinted copy.
+    
+    Pages, dotfiles (.htaccess, .nojekyll) and files without an extension
+    (CNAME) are read by servers and hosts under their own name, never
+    linked by URL, so they are skipped.
+    """
+    return not (
+        file.startswith(".")
+        or not os.path.splitext(file)[1]
+        or file.endswith(_UNFINGERPRINTED_EXTENSIONS)
+    )
+
+# ioctl request that clones a file's extents on Linux (btrfs, XFS, ...)
+FICLONE = 0x40049409
+
+# Errors meaning a fast path is unsupported here, so fall back to copying
+_UNSUPPORTED_ERRNOS = {
+    errno.EXDEV, errno.EPERM, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP,
+    errno.ENOTTY, errno.EMLINK, errno.EBADF,
+}
+
+
+def _reflink(source_path, dest_path):
+    """Clone a file's data blocks with the FICLONE ioctl (copy-on-write)."""
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "reflink is not supported on this platform")
+    
+    with open(source_path, 'rb') as source, open(dest_path, 'wb') as dest:
+        try:
+            fcntl.ioctl(dest.fileno(), FICLONE, source.fileno())
+        except OSError:
+            dest.close()
+            os.remove(dest_path)
+            raise
+
+
+def _copy_file_range(source_path, dest_path):
+    """Copy a file inside the kernel with os.copy_file_range."""
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range is not supported on this platform")
+    
+    with open(source_path, 'rb') as source, open(dest_path, 'wb') as dest:
+        try:
+            remaining = os.fstat(source.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(source.fileno(), dest.fileno(), remaining)
+                if copied == 0:
+                    # Some filesystems stop short instead of failing; a
+                    # truncated copy must not be put in place
+                    raise OSError(errno.EINVAL, "copy_file_range stopped before the end of the file")
+                remaining -= copied
+        except OSError:
+            dest.close()
+            os.remove(dest_path)
+            raise
+
+
+def copy_file(source_path, dest_path, mode="copy"):
+    """
+    Copy a single file, using a zero-copy fast path when asked to.
+    
+    The copy is made next to the destination and renamed over it, so the
+    destination is replaced atomically and never seen half written.
+    
+    Modes:
+        copy:     shutil.copy2 (uses sendfile on Linux)
+        hardlink: hard-link the destination to the source; the two then
+                  share data, so the destination must never be edited
+        reflink:  copy-on-write clone on filesystems that support it
+        auto:     reflink, then copy_file_range, then a regular copy
+    
+    Any fast path that is unsupported (different filesystem, unsupported
+    filesystem or platform) falls back to a regular copy. The source mtime
+    is always preserved so incremental syncs can compare it.
+    
+    Args:
+        source_path (str): Path to the source file
+        dest_path (str): Path to the destination file
+        mode (str): One of COPY_MODES (default: "copy")
+        
+    Returns:
+        str: The method that was actually used
+    """
+    if mode not in COPY_MODES:
+        raise ValueError(f"Invalid copy mode: {mode}")
+    
+    # Renaming over the destination also never writes through an existing
+    # file, which may be a hard link to a previous version of the source
+    tmp_path = temp_path(dest_path)
+    try:
+        method = _copy_to(source_path, tmp_path, mode)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return method
+
+
+def _copy_to(source_path, dest_path, mode):
+    """Copy a file to a path that does not exist yet; see copy_file."""
+    if mode == "hardlink":
+        try:
+            os.link(source_path, dest_path)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    
+    if mode in ("reflink", "auto"):
+        fast_paths = [("reflink", _reflink)]
+        if mode == "auto":
+            fast_paths.append(("copy_file_range", _copy_file_range))
+        for method, fast_copy in fast_paths:
+            try:
+                fast_copy(source_path, dest_path)
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED_ERRNOS:
+                    raise
+                continue
+            shutil.copystat(source_path, dest_path)
+            return method
+    
+    shutil.copy2(source_path, dest_path)
+    return "copy"
+
+
+def fingerprint_path(path, digest):
+    """
+    Return path with a content hash inserted before its extension.
+    
+    Example: fingerprint_path("css/site.css", "3f9a...") -> "css/site.3f9a0c1b2d.css"
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:FINGERPRINT_LENGTH]}{ext}"
+
+
+class AssetMap(Mapping):
+    """
+    A read-only map of site-absolute asset URLs to their fingerprinted URLs.
+    
+    Built once the static files are synced and fixed for the rest of the
+    build. Rendered pages and blocks depend on the asset names, so the
+    digest of the map is computed here, once, for the template and block
+    cache keys.
+    """
+    
+    def __init__(self, urls=None):
+        self._urls = dict(urls or {})
+        self.digest = hashlib.sha256(json.dumps(self._urls, sort_keys=True).encode("utf-8")).hexdigest()
+    
+    def __getitem__(self, url):
+        return self._urls[url]
+    
+    def get(self, url, default=None):
+        return self._urls.get(url, default)
+    
+    def __iter__(self):
+        return iter(self._urls)
+    
+    def __len__(self):
+        return len(self._urls)
+    
+    def __repr__(self):
+        return f"AssetMap({len(self._urls)} assets, {self.digest[:FINGERPRINT_LENGTH]})"
+
+
+def copy_directory_recursive(source_dir, dest_dir, copy_mode="copy", keep=None, outputs=None, asset_map=None):
     """
-    Recursively copy all contents from source directory to destination directory.
+    Make a destination directory an exact copy of a source directory.
     
-    First deletes all contents of the destination directory to ensure a clean copy,
-    then copies all files and subdirectories from source to destination.
+    Every file is compared by content, ignoring mtimes: only files whose
+    content differs are copied (atomically, see copy_file), and files that
+    are not in the source are removed unless keep says otherwise. Files
+    that already match keep their mtime, so a deploy that compares mtimes
+    does not upload them again.
     
     Args:
         source_dir (str): Path to the source directory
         dest_dir (str): Path to the destination directory
+        copy_mode (str): How files are copied, see copy_file (default: "copy")
+        keep (callable): See sync_directory (default: None)
+        outputs (OutputRecorder): See sync_directory (default: None)
+        asset_map (dict): See sync_directory (default: None)
+        
+    Returns:
+        dict: Counts of "copied", "unchanged" and "removed" files
     """
-    # First, clean up the destination directory
-    if os.path.exists(dest_dir):
-        print(f"Cleaning destination directory: {dest_dir}")
-        shutil.rmtree(dest_dir)
+    return sync_directory(
+        source_dir, dest_dir, checksum=True, keep=keep, copy_mode=copy_mode, outputs=outputs, asset_map=asset_map,
+    )
+
+
+def _is_unchanged(source_path, dest_path, checksum, outputs=None):
+    """
+    Check whether a destination file already matches its source.
     
-    # Create the destination directory
-    print(f"Creating destination directory: {dest_dir}")
-    os.mkdir(dest_dir)
+    Files match when size and mtime agree, or, with checksum enabled,
+    when size and content hash agree. Without checksum, files of the same
+    size but a different mtime are compared by content too, so a source
+    that was touched but not edited is not rewritten. The copy keeps its
+    own mtime, so the mtimes never converge; instead the match is recorded
+    in outputs, and trusted by the next sync while neither file changes.
+    """
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
     
-    # Check if source directory exists
-    if not os.path.exists(source_dir):
-        print(f"Source directory does not exist: {source_dir}")
-        return
+    source_stat = os.stat(source_path)
+    if source_stat.st_size != dest_stat.st_size:
+        return False
     
-    # Copy all contents recursively
-    _copy_directory_contents(source_dir, dest_dir)
-    print(f"Finished copying from {source_dir} to {dest_dir}")
+    if not checksum:
+        if source_stat.st_mtime_ns == dest_stat.st_mtime_ns:
+            return True
+        if outputs is not None and outputs.matches_source(dest_path, dest_stat, source_stat):
+            return True
+    return file_digest(source_path) == file_digest(dest_path)
 
 
-def _copy_directory_contents(source_dir, dest_dir):
+def sync_directory(source_dir, dest_dir, checksum=False, keep=None, copy_mode="copy", outputs=None, asset_map=None):
     """
-    Helper function to recursively copy directory contents.
+    Incrementally synchronize a destination directory with a source directory.
+    
+    Only files that are new or changed (by size and mtime, or by content
+    hash when checksum is enabled) are copied. Files in the destination
+    that no longer exist in the source are removed, unless keep says
+    otherwise, which lets generated files live alongside the copies.
     
     Args:
         source_dir (str): Path to the source directory
         dest_dir (str): Path to the destination directory
+        checksum (bool): Compare file contents instead of mtimes (default: False)
+        keep (callable): Called with a destination path relative to dest_dir;
+                         returns True for stale files that must not be removed
+                         (default: None, remove all stale files)
+        copy_mode (str): How files are copied, see copy_file (default: "copy")
+        outputs (OutputRecorder): Records every synced file and its content
+                                  hash (default: None)
+        asset_map (dict): If given, every asset except HTML files, dotfiles
+                          and files without an extension is also linked
+                          (or copied) under a fingerprinted name (see
+                          fingerprint_path), and the map is filled with
+                          site-absolute URLs, e.g. "/index.css" ->
+                          "/index.3f9a0c1b2d.css". Fingerprinted copies
+                          never change, so they can be cached forever;
+                          the original names stay in place for references
+                          that cannot be rewritten, such as url() in CSS.
+                         
+    Returns:
+        dict: Counts of "copied", "unchanged" and "removed" files
     """
-    # List all items in the source directory
-    items = os.listdir(source_dir)
+    counts = {"copied": 0, "unchanged": 0, "removed": 0}
     
-    for item in items:
-        source_path = os.path.join(source_dir, item)
-        dest_path = os.path.join(dest_dir, item)
+    if not os.path.exists(dest_dir):
+        logger.debug("Creating destination directory: %s", dest_dir)
+        os.makedirs(dest_dir)
+    
+    # Check if source directory exists
+    if not os.path.exists(source_dir):
+        logger.warning("Source directory does not exist: %s", source_dir)
+        return counts
+    
+    source_files = set()
+    source_dirs = set()
+    
+    for root, dirs, files in os.walk(source_dir):
+        rel_root = os.path.relpath(root, source_dir)
+        dest_root = os.path.normpath(os.path.join(dest_dir, rel_root))
+        source_dirs.add(rel_root)
+        
+        # A file in the way of a directory is stale
+        if os.path.isfile(dest_root):
+            os.remove(dest_root)
+            counts["removed"] += 1
+        if not os.path.exists(dest_root):
+            logger.debug("Creating directory: %s", dest_root)
+            os.makedirs(dest_root)
         
-        if os.path.isfile(source_path):
-            # If it's a file, copy it
-            print(f"Copying file: {source_path} -> {dest_path}")
-            shutil.copy(source_path, dest_path)
-        else:
-            # If it's a directory, create it and recursively copy its contents
-            print(f"Creating directory: {dest_path}")
-            os.mkdir(dest_path)
-            _copy_directory_contents(source_path, dest_path)
+        # Content hashes of the synced copies, reused to fingerprint them
+        digests = {}
+        for file in files:
+            source_path = os.path.join(root, file)
+            dest_path = os.path.join(dest_root, file)
+            source_files.add(os.path.normpath(os.path.join(rel_root, file)))
+            
+            if _is_unchanged(source_path, dest_path, checksum, outputs):
+                counts["unchanged"] += 1
+                if outputs is not None:
+                    digests[file] = outputs.record(dest_path, source_path=source_path)
+                continue
+            
+            # A directory in the way of a file is stale
+            if os.path.isdir(dest_path):
+                shutil.rmtree(dest_path)
+            
+            logger.debug("Copying file: %s -> %s", source_path, dest_path)
+            # The copy keeps the source mtime, which is what the next sync compares
+            copy_file(source_path, dest_path, copy_mode)
+            counts["copied"] += 1
+            if outputs is not None:
+                # Hashed explicitly: a copy keeps the source mtime, which
+                # may match the stale hash of the file it replaced
+                digests[file] = outputs.record(dest_path, file_digest(dest_path))
+        
+        if asset_map is not None:
+            for file in files:
+                if not _is_fingerprinted(file):
+                    continue
+                source_path = os.path.join(root, file)
+                rel_path = os.path.normpath(os.path.join(rel_root, file))
+                # The copy matches the source, so with outputs its hash is
+                # usually known from the previous build and not read again
+                digest = digests.get(file) or file_digest(source_path)
+                fingerprinted = fingerprint_path(rel_path, digest)
+                source_files.add(fingerprinted)
+                asset_map["/" + rel_path.replace(os.sep, "/")] = "/" + fingerprinted.replace(os.sep, "/")
+                
+                # The name is derived from the content, so an existing file
+                # of the right size is already up to date
+                dest_path = os.path.join(dest_dir, fingerprinted)
+                if os.path.isfile(dest_path) and os.path.getsize(dest_path) == os.path.getsize(source_path):
+                    counts["unchanged"] += 1
+                else:
+                    # Linked to the copy just synced, so the asset takes no
+                    # extra space; copy_file falls back to copying where
+                    # links are unsupported, and replaces rather than
+                    # writes through links, so neither name changes the other
+                    synced_path = os.path.join(dest_root, file)
+                    logger.debug("Linking file: %s -> %s", synced_path, dest_path)
+                    copy_file(synced_path, dest_path, "hardlink")
+                    counts["copied"] += 1
+                if outputs is not None:
+                    outputs.record(dest_path, digest)
+    
+    # Remove stale files, then any directories they leave empty
+    for root, dirs, files in os.walk(dest_dir, topdown=False):
+        rel_root = os.path.relpath(root, dest_dir)
+        for file in files:
+            rel_path = os.path.normpath(os.path.join(rel_root, file))
+            if rel_path in source_files or (keep is not None and keep(rel_path)):
+                continue
+            logger.debug("Removing stale file: %s", os.path.join(root, file))
+            os.remove(os.path.join(root, file))
+            counts["removed"] += 1
+        
+        if rel_root not in source_dirs and not os.listdir(root):
+            os.rmdir(root)
+    
+    logger.info(
+        "Finished syncing from %s to %s: %d copied, %d unchanged, %d removed",
+        source_dir, dest_dir, counts["copied"], counts["unchanged"], counts["removed"],
+    )
+    return counts
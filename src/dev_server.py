@@ -0,0 +1,402 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from build_log import get_logger
+from copy_static import copy_file, sync_directory
+from generate_page import generate_page, generate_pages_recursive
+
+
+logger = get_logger(__name__)
+
+# inotify event flags, see inotify(7)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+WATCH_MASK = (
+    IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+)
+
+# struct inotify_event without the trailing name: wd, mask, cookie, len
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Time to keep collecting events after the first one, so an editor's
+# write-rename-chmod sequence is handled as a single change
+DEBOUNCE_SECONDS = 0.05
+
+
+def _is_under(path, root):
+    return path == root or path.startswith(root.rstrip(os.sep) + os.sep)
+
+
+class PollingWatcher:
+    """
+    Detect changes by periodically comparing (mtime, size) snapshots.
+
+    Works everywhere, but each poll stats every watched file.
+    """
+
+    def __init__(self, paths, interval=0.5):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self.interval = interval
+        self._snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        snapshot = {}
+        for path in self.paths:
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+                continue
+            for root, dirs, files in os.walk(path):
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+                    snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """
+        Wait for changes.
+
+        Returns:
+            set: Paths of files that were added, modified or deleted; empty
+                 if nothing changed before the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval)
+            snapshot = self._take_snapshot()
+            changed = {
+                path for path in snapshot.keys() | self._snapshot.keys()
+                if snapshot.get(path) != self._snapshot.get(path)
+            }
+            self._snapshot = snapshot
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Detect changes with Linux inotify, watching directories recursively.
+
+    Watching a single file watches its parent directory, and only events
+    for that file are reported.
+    """
+
+    def __init__(self, paths):
+        self.paths = [os.path.abspath(path) for path in paths]
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+        self._watches = {}
+
+        for path in self.paths:
+            if os.path.isdir(path):
+                self._add_tree(path)
+            else:
+                self._add_watch(os.path.dirname(path))
+
+    def _add_watch(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), directory)
+        self._watches[wd] = directory
+
+    def _add_tree(self, directory):
+        """Watch a directory and every directory below it; return the files found."""
+        files = []
+        for root, dirs, names in os.walk(directory):
+            self._add_watch(root)
+            files.extend(os.path.join(root, name) for name in names)
+        return files
+
+    def _is_watched(self, path):
+        return any(_is_under(path, root) for root in self.paths)
+
+    def _read_events(self):
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                return changed
+
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length]
+                offset += _EVENT_HEADER.size + length
+
+                if mask & IN_Q_OVERFLOW:
+                    # Events were lost; report every watched root
+                    changed.update(self.paths)
+                    continue
+                if mask & IN_IGNORED:
+                    self._watches.pop(wd, None)
+                    continue
+
+                directory = self._watches.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name.rstrip(b"\0"))) if length else directory
+
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    # Files may have been moved in along with the directory
+                    try:
+                        changed.update(self._add_tree(path))
+                    except OSError:
+                        pass
+
+                if self._is_watched(path):
+                    changed.add(path)
+
+    def wait(self, timeout=None):
+        """
+        Wait for changes.
+
+        Returns:
+            set: Paths that were added, modified or deleted; empty if
+                 nothing changed before the timeout
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = self._read_events()
+        time.sleep(DEBOUNCE_SECONDS)
+        changed |= self._read_events()
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+
+def create_watcher(paths, interval=0.5):
+    """Return an InotifyWatcher where inotify is available, else a PollingWatcher."""
+    try:
+        return InotifyWatcher(paths)
+    except (OSError, AttributeError, TypeError):
+        # AttributeError: libc has no inotify functions (not Linux)
+        return PollingWatcher(paths, interval)
+
+
+class SiteRebuilder:
+    """
+    Rebuild only the outputs affected by a set of changed source paths.
+
+    - a markdown file regenerates (or removes) its own page
+    - a static file is copied (or removed) on its own
+    - a template change regenerates every page through the build manifest
+    - a watched root itself, reported when the watcher lost events, syncs
+      all of static/ or regenerates all out-of-date pages
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, docs_dir, basepath="/",
+                 manifest_path=None, copy_mode="copy"):
+        self.content_dir = os.path.abspath(content_dir)
+        self.static_dir = os.path.abspath(static_dir)
+        self.template_path = os.path.abspath(template_path)
+        self.docs_dir = os.path.abspath(docs_dir)
+        self.basepath = basepath
+        self.manifest_path = manifest_path
+        self.copy_mode = copy_mode
+
+    def watched_paths(self):
+        return [self.content_dir, self.static_dir, self.template_path]
+
+    def _page_dest(self, markdown_path):
+        rel_path = os.path.relpath(markdown_path, self.content_dir)
+        return os.path.join(self.docs_dir, rel_path.replace('.md', '.html'))
+
+    def _rebuild_all_pages(self):
+        """Regenerate out-of-date pages and remove those whose markdown is gone."""
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.docs_dir, self.basepath, self.manifest_path
+        )
+        return self._remove_stale_pages(self.content_dir)
+
+    def _remove_stale_pages(self, content_subdir):
+        """Remove pages below a deleted content directory; return their paths."""
+        removed = []
+        dest_subdir = os.path.join(self.docs_dir, os.path.relpath(content_subdir, self.content_dir))
+        for root, dirs, files in os.walk(dest_subdir):
+            for file in files:
+                dest_path = os.path.join(root, file)
+                rel_path = os.path.relpath(dest_path, self.docs_dir)
+                markdown_path = os.path.join(self.content_dir, rel_path.replace('.html', '.md'))
+                # HTML files copied from static/ are not pages
+                if (file.endswith('.html') and not os.path.exists(markdown_path)
+                        and not os.path.exists(os.path.join(self.static_dir, rel_path))):
+                    os.remove(dest_path)
+                    removed.append(dest_path)
+        return removed
+
+    def _sync_static(self):
+        sync_directory(
+            self.static_dir, self.docs_dir,
+            keep=lambda rel_path: rel_path.endswith(".html"), copy_mode=self.copy_mode,
+        )
+
+    def _rebuild_content(self, path):
+        if os.path.isdir(path):
+            # Files inside a new directory are reported individually
+            return []
+
+        dest_path = self._page_dest(path)
+        if path.endswith('.md'):
+            if os.path.isfile(path):
+                generate_page(path, self.template_path, dest_path, self.basepath)
+                return [dest_path]
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                return [dest_path]
+        if not os.path.exists(path):
+            return self._remove_stale_pages(path)
+        return []
+
+    def _rebuild_static(self, path):
+        dest_path = os.path.join(self.docs_dir, os.path.relpath(path, self.static_dir))
+        if os.path.isdir(path):
+            # Files inside a new directory are reported individually
+            if not os.path.isdir(dest_path):
+                os.makedirs(dest_path)
+            return []
+
+        if os.path.isfile(path):
+            dest_dir = os.path.dirname(dest_path)
+            if not os.path.isdir(dest_dir):
+                os.makedirs(dest_dir)
+            copy_file(path, dest_path, self.copy_mode)
+            return [dest_path]
+
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+            return [dest_path]
+
+        if os.path.isdir(dest_path):
+            # A whole directory was moved away; let a sync clean it up
+            self._sync_static()
+            return [dest_path]
+        return []
+
+    def rebuild(self, changed_paths):
+        """
+        Apply a set of changed paths to the output directory.
+
+        Args:
+            changed_paths (set): Absolute paths of changed sources
+
+        Returns:
+            list: Output paths that were written or removed
+        """
+        changed_paths = sorted(os.path.abspath(path) for path in changed_paths)
+        # A watched root is reported when the watcher lost events, so any
+        # file below it may have changed or been deleted
+        all_pages = self.template_path in changed_paths or self.content_dir in changed_paths
+        all_static = self.static_dir in changed_paths
+        updated = []
+
+        if all_pages:
+            # Every page depends on the template; the manifest skips nothing.
+            # Pages of markdown deleted in the same batch are removed too.
+            updated.extend(self._rebuild_all_pages())
+            updated.append(self.docs_dir)
+        if all_static:
+            self._sync_static()
+            if not all_pages:
+                updated.append(self.docs_dir)
+
+        for path in changed_paths:
+            if _is_under(path, self.content_dir) and not all_pages:
+                updated.extend(self._rebuild_content(path))
+            elif _is_under(path, self.static_dir) and not all_static:
+                updated.extend(self._rebuild_static(path))
+
+        return updated
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    """Request handler that only logs errors, not every request."""
+
+    def log_request(self, code="-", size="-"):
+        if isinstance(code, int) and code >= 400:
+            super().log_request(code, size)
+
+
+def make_server(docs_dir, host="localhost", port=8888):
+    """Create a threaded HTTP server for the output directory."""
+    handler = partial(_QuietHandler, directory=docs_dir)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(rebuilder, host="localhost", port=8888, watch=False, interval=0.5):
+    """
+    Serve the output directory, optionally rebuilding on source changes.
+
+    Args:
+        rebuilder (SiteRebuilder): Describes the site being served
+        host (str): Interface to bind (default: "localhost")
+        port (int): Port to listen on (default: 8888)
+        watch (bool): Watch sources and rebuild affected outputs (default: False)
+        interval (float): Polling interval when inotify is unavailable
+    """
+    server = make_server(rebuilder.docs_dir, host, port)
+    logger.info("Serving %s at http://%s:%d/", rebuilder.docs_dir, host, server.server_address[1])
+
+    if not watch:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    watcher = create_watcher(rebuilder.watched_paths(), interval)
+    logger.info("Watching for changes using %s", type(watcher).__name__)
+    try:
+        while True:
+            changed = watcher.wait(1.0)
+            if not changed:
+                continue
+            try:
+                updated = rebuilder.rebuild(changed)
+            except Exception as e:
+                # Keep serving while a half-edited file fails to build
+                logger.error("Rebuild failed: %s", e)
+                continue
+            logger.info("Rebuilt %d output(s) for %d change(s)", len(updated), len(changed))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        server.shutdown()
+        server.server_close()
@@ -1,4 +1,4 @@
-import re
+from patterns import IMAGE_PATTERN, LINK_PATTERN
 
 
 def extract_markdown_images(text):
@@ -6,11 +6,7 @@ def extract_markdown_images(text):
     Extract markdown images from text.
     Returns a list of tuples: (alt_text, url)
     """
-    # Pattern for markdown images: ![alt text](url)
-    # Use non-greedy matching and handle nested brackets
-    pattern = r"!\[([^\]]*)\]\(([^\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
@@ -18,9 +14,4 @@ def extract_markdown_links(text):
     Extract markdown links from text.
     Returns a list of tuples: (anchor_text, url)
     """
-    # Pattern for markdown links: [anchor text](url)
-    # But not images (which start with !)
-    # Use non-greedy matching and handle nested brackets
-    pattern = r"(?<!!)\[([^\]]*)\]\(([^\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
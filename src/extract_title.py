@@ -1,12 +1,10 @@
-import re
-
-
 def extract_title(markdown):
     """
     Extract the h1 header from a markdown document.
     
     Args:
-        markdown (str): The markdown content
+        markdown (str): The markdown content, or an iterable of lines such as
+                        an open file; reading stops at the first h1
         
     Returns:
         str: The title text without the # symbol and stripped of whitespace
@@ -14,11 +12,11 @@ def extract_title(markdown):
     Raises:
         ValueError: If no h1 header is found
     """
-    lines = markdown.split('\n')
+    lines = markdown.split('\n') if isinstance(markdown, str) else markdown
     
     for line in lines:
         # Check if line starts with exactly one # followed by a space
-        if re.match(r'^# ', line):
+        if line.startswith('# '):
             # Remove the # and any leading/trailing whitespace
             title = line[2:].strip()
             if title:  # Make sure there's actual content after the #
@@ -1,10 +1,35 @@
+import hashlib
+import json
 import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 
-from markdown_blocks import markdown_to_html_node
-from extract_title import extract_title
+from block_cache import BlockCache
+from build_log import ProgressCounter, get_logger
+from change_manifest import OutputRecorder
+from markdown_blocks import DocumentMetadata, iter_markdown_html
+from output_files import AtomicWriter
+from profiler import BuildProfiler
+from template import load_template
 
 
-def generate_page(from_path, template_path, dest_path, basepath="/"):
+logger = get_logger(__name__)
+
+# Rendered page content is buffered in memory up to this size while the
+# title is being found, and spilled to a temporary file beyond it
+CONTENT_SPOOL_BYTES = 4 * 1024 * 1024
+
+# Characters read from the content buffer per template chunk
+CONTENT_READ_CHARS = 64 * 1024
+
+
+def generate_page(from_path, template_path, dest_path, basepath="/", variables=None, block_cache=None, profiler=None,
+                  output_counts=None, outputs=None, asset_map=None):
     """
     Generate an HTML page from a markdown file using a template.
     
@@ -13,79 +38,622 @@ def generate_page(from_path, template_path, dest_path, basepath="/"):
         template_path (str): Path to the HTML template file
         dest_path (str): Path where the generated HTML should be saved
         basepath (str): Base path for URLs (default: "/")
+        variables (dict): Extra template slot values (default: None)
+        block_cache (BlockCache): Cache of rendered blocks (default: None)
+        profiler (BuildProfiler): Records the page and its phases (default: None)
+        output_counts (dict): If given, its "changed" or "unchanged" count is
+                              incremented depending on whether the page
+                              differed from the existing output
+        outputs (OutputRecorder): Records the page and its content hash
+                                  (default: None)
+        asset_map (AssetMap): Site-absolute asset URLs to their
+                              fingerprinted URLs; href and src attributes
+                              in the template, and link and image URLs in
+                              the content, point at them (default: None)
+        
+    Returns:
+        DocumentMetadata: Title, heading outline and word count of the page
+        
+    Raises:
+        ValueError: If the markdown has no h1 header
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    logger.debug("Generating page from %s to %s using %s", from_path, dest_path, template_path)
     
-    # Read the markdown file
-    with open(from_path, 'r', encoding='utf-8') as f:
-        markdown_content = f.read()
+    # The compiled template is cached across pages
+    template = load_template(template_path, basepath, asset_map)
     
-    # Read the template file
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+    if profiler is None:
+        metadata, changed, digest = _write_page(
+            from_path, template, dest_path, basepath, variables, block_cache, asset_map=asset_map
+        )
+    else:
+        with profiler.page(from_path):
+            metadata, changed, digest = _write_page(
+                from_path, template, dest_path, basepath, variables, block_cache, profiler, asset_map
+            )
     
-    # Convert markdown to HTML
-    html_node = markdown_to_html_node(markdown_content)
-    html_content = html_node.to_html()
+    if output_counts is not None:
+        output_counts["changed" if changed else "unchanged"] += 1
+    if outputs is not None:
+        outputs.record(dest_path, digest)
+    return metadata
+
+
+def _write_page(from_path, template, dest_path, basepath, variables, block_cache, profiler=None, asset_map=None):
+    """
+    Render one markdown file through a compiled template; see generate_page.
     
-    # Extract the title
-    title = extract_title(markdown_content)
+    Returns:
+        tuple: (metadata, changed, digest)
+    """
+    metadata = DocumentMetadata()
+    with tempfile.SpooledTemporaryFile(CONTENT_SPOOL_BYTES, mode='w+', encoding='utf-8') as content:
+        # Read and render the markdown block by block in a single pass, with
+        # the asset map and base path applied to link and image URLs as they
+        # are emitted.
+        # The title is collected along the way; the template needs it before
+        # the content, so the rendered HTML is buffered until the parse ends.
+        with open(from_path, 'r', encoding='utf-8') as f:
+            lines = f if profiler is None else profiler.read_lines(f)
+            for chunk in iter_markdown_html(lines, basepath, metadata, block_cache, profiler, asset_map):
+                content.write(chunk)
+        
+        def content_chunks():
+            content.seek(0)
+            return iter(partial(content.read, CONTENT_READ_CHARS), "")
+        
+        values = dict(variables or {})
+        values["Title"] = metadata.require_title()
+        values["Content"] = content_chunks
+        
+        # Stream the final HTML to a temporary file that only replaces the
+        # destination if the page changed, so unchanged pages keep their
+        # mtime and deploys can skip them
+        with AtomicWriter(dest_path) as f:
+            if profiler is None:
+                template.write(f, values)
+            else:
+                for chunk in profiler.timed_iter("template", template.iter_render(values)):
+                    with profiler.phase("write"):
+                        f.write(chunk)
+    
+    return metadata, f.changed, f.digest
+
+
+def render_page(markdown, template, basepath="/", variables=None, block_cache=None, profiler=None, asset_map=None):
+    """
+    Render markdown held in memory to a complete HTML page.
     
-    # Replace placeholders in template
-    final_html = template_content.replace("{{ Title }}", title)
-    final_html = final_html.replace("{{ Content }}", html_content)
+    Args:
+        markdown (str): The markdown source
+        template (Template): Compiled page template
+        basepath (str): Base path for URLs (default: "/")
+        variables (dict): Extra template slot values (default: None)
+        block_cache (BlockCache): Cache of rendered blocks (default: None)
+        profiler (BuildProfiler): Times the parse and template phases (default: None)
+        asset_map (AssetMap): Fingerprinted asset URLs, see generate_page
+                              (default: None)
+        
+    Returns:
+        tuple: (html, metadata)
+        
+    Raises:
+        ValueError: If the markdown has no h1 header
+    """
+    metadata = DocumentMetadata()
+    content = "".join(
+        iter_markdown_html(markdown.split("\n"), basepath, metadata, block_cache, profiler, asset_map)
+    )
     
-    # Replace base path URLs
-    # Remove trailing slash from basepath if it exists to avoid double slashes
-    clean_basepath = basepath.rstrip('/')
-    final_html = final_html.replace('href="/', f'href="{clean_basepath}/')
-    final_html = final_html.replace('src="/', f'src="{clean_basepath}/')
+    values = dict(variables or {})
+    values["Title"] = metadata.require_title()
+    values["Content"] = content
     
-    # Create destination directory if it doesn't exist
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir and not os.path.exists(dest_dir):
-        os.makedirs(dest_dir)
+    if profiler is None:
+        return template.render(values), metadata
+    with profiler.phase("template"):
+        return template.render(values), metadata
+
+
+MANIFEST_VERSION = 1
+
+
+def _hash_bytes(data):
+    """Return the hex sha256 digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _hash_file(path):
+    """Return the hex sha256 digest of a file's contents."""
+    with open(path, 'rb') as f:
+        return _hash_bytes(f.read())
+
+
+def load_manifest(manifest_path):
+    """
+    Load a build manifest from disk.
     
-    # Write the final HTML to destination
-    with open(dest_path, 'w', encoding='utf-8') as f:
-        f.write(final_html)
+    Args:
+        manifest_path (str): Path to the manifest JSON file
+        
+    Returns:
+        dict: Mapping of output path (relative to the destination directory)
+              to the inputs it was last built from. Empty if the manifest is
+              missing, unreadable or from an older manifest version.
+    """
+    if manifest_path is None or not os.path.exists(manifest_path):
+        return {}
     
-    print(f"Page generated successfully: {dest_path}")
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("pages", {})
+
 
+def save_manifest(manifest_path, pages):
+    """
+    Atomically write a build manifest to disk.
+    
+    Args:
+        manifest_path (str): Path to the manifest JSON file
+        pages (dict): Mapping of output path to build inputs
+    """
+    manifest_dir = os.path.dirname(manifest_path)
+    if manifest_dir and not os.path.exists(manifest_dir):
+        os.makedirs(manifest_dir)
+    
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"version": MANIFEST_VERSION, "pages": pages}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/"):
+
+def _template_hash(template, variables):
+    """Return a digest covering the template source and extra variables."""
+    if not variables:
+        return template.digest
+    encoded = json.dumps(variables, sort_keys=True).encode('utf-8')
+    return _hash_bytes(template.digest.encode('utf-8') + encoded)
+
+
+def _page_is_current(entry, stat, markdown_path, dest_path, template_hash, basepath):
+    """
+    Check a manifest entry against the current inputs of a page.
+    
+    The cheap stat comparison is tried first; the content hash is only
+    computed when the size or mtime of the markdown file changed.
+    
+    Returns:
+        tuple: (is_current, content_hash). content_hash is None when the
+               file did not need to be hashed.
+    """
+    if entry is None or not os.path.exists(dest_path):
+        return False, None
+    
+    if entry.get("template_hash") != template_hash or entry.get("basepath") != basepath:
+        return False, None
+    
+    if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+        return True, entry.get("content_hash")
+    
+    content_hash = _hash_file(markdown_path)
+    return content_hash == entry.get("content_hash"), content_hash
+
+
+# Block cache, profiler and asset map of a worker process, set by _init_worker
+_worker_block_cache = None
+_worker_profiler = None
+_worker_asset_map = None
+
+
+def _init_worker(max_entries, cache_dir, profile, asset_map):
+    global _worker_block_cache, _worker_profiler, _worker_asset_map
+    # Sent once per worker rather than with every page
+    _worker_asset_map = asset_map
+    if max_entries:
+        _worker_block_cache = BlockCache(max_entries, cache_dir)
+    if profile:
+        _worker_profiler = BuildProfiler()
+
+
+def _generate_page_in_worker(markdown_path, template_path, dest_path, basepath, variables):
+    """
+    Generate a page in a worker process.
+    
+    Returns:
+        tuple: (output_counts, output_files, cache_counts, cache_entries,
+               page_record). output_counts tells whether the page changed
+               and output_files holds its OutputRecorder record;
+               cache_counts are the block cache (hits, disk_hits, misses)
+               for this page, cache_entries is (pid, entries) for the
+               worker's cache after it, and page_record is the profiler
+               record, each None when the worker has no cache or profiler.
+    """
+    cache = _worker_block_cache
+    profiler = _worker_profiler
+    before = cache.counts() if cache is not None else None
+    output_counts = {"changed": 0, "unchanged": 0}
+    outputs = OutputRecorder()
+    generate_page(
+        markdown_path, template_path, dest_path, basepath, variables, cache, profiler, output_counts, outputs,
+        _worker_asset_map,
+    )
+    
+    cache_counts = cache_entries = None
+    if cache is not None:
+        cache_counts = tuple(after - start for after, start in zip(cache.counts(), before))
+        cache_entries = (os.getpid(), len(cache))
+    page_record = profiler.pages.pop() if profiler is not None else None
+    return output_counts, outputs.files, cache_counts, cache_entries, page_record
+
+
+# Maximum number of items waiting between two pipeline stages: markdown
+# files read ahead of the renderer, and rendered pages waiting to be written
+PIPELINE_QUEUE_SIZE = 16
+
+# Marks the end of a pipeline queue
+_END_OF_QUEUE = None
+
+
+def _read_stage(pages, read_queue):
+    """
+    Pipeline stage: read markdown files ahead of the renderer.
+    
+    Files larger than CONTENT_SPOOL_BYTES are not read into memory; they
+    are passed on as None and generated by streaming from disk instead.
+    Each item carries the seconds spent reading, for the profiler.
+    """
+    for index, (markdown_path, dest_path) in enumerate(pages):
+        start = time.perf_counter()
+        try:
+            if os.path.getsize(markdown_path) > CONTENT_SPOOL_BYTES:
+                markdown = None
+            else:
+                with open(markdown_path, 'r', encoding='utf-8') as f:
+                    markdown = f.read()
+        except Exception as e:
+            markdown = e
+        read_queue.put((index, markdown_path, dest_path, markdown, time.perf_counter() - start))
+    read_queue.put(_END_OF_QUEUE)
+
+
+def _write_stage(write_queue, failures, output_counts, outputs, progress, write_times):
+    """
+    Pipeline stage: write rendered pages and account for every page.
+    
+    Every page passes through this stage, including those that failed or
+    were written by the renderer, so the failures, output counts and
+    progress are only ever updated from this thread.
+    
+    Each item is (index, markdown_path, dest_path, result, page_record),
+    where result is the rendered HTML, the exception the page failed with,
+    or the output counts of a page that was already written. Write times
+    are appended to write_times as (page_record, seconds) for pages with
+    a profiler record.
+    """
+    while True:
+        item = write_queue.get()
+        if item is _END_OF_QUEUE:
+            return
+        index, markdown_path, dest_path, result, page_record = item
+        if isinstance(result, Exception):
+            failures.append((index, markdown_path, result))
+        elif isinstance(result, dict):
+            for key, count in result.items():
+                output_counts[key] += count
+        else:
+            start = time.perf_counter()
+            try:
+                with AtomicWriter(dest_path) as f:
+                    f.write(result)
+                if outputs is not None:
+                    outputs.record(dest_path, f.digest)
+            except Exception as e:
+                failures.append((index, markdown_path, e))
+            else:
+                output_counts["changed" if f.changed else "unchanged"] += 1
+                if page_record is not None:
+                    write_times.append((page_record, time.perf_counter() - start))
+        progress.advance()
+
+
+def _generate_pages_pipelined(pages, template_path, basepath, variables, block_cache, profiler, progress,
+                              output_counts, outputs, asset_map):
+    """
+    Generate pages with reading, rendering and writing overlapped.
+    
+    A reader thread prefetches markdown files and a writer thread writes
+    rendered pages, while the calling thread parses and renders. The
+    bounded queues between the stages cap how many files are held in
+    memory at once. File I/O releases the GIL, so I/O latency (e.g. on a
+    network filesystem) is hidden behind rendering.
+    
+    With a profiler, the reader's and writer's time is added to each page
+    record as its "read" and "write" phases once the threads are done.
+    
+    Returns:
+        list: (markdown_path, exception) tuples, in the order of pages
+    """
+    template = load_template(template_path, basepath, asset_map)
+    read_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+    write_queue = queue.Queue(PIPELINE_QUEUE_SIZE)
+    failures = []
+    write_times = []
+    
+    # Daemon threads, so an interrupted build does not hang on a full queue
+    reader = threading.Thread(target=_read_stage, args=(pages, read_queue), daemon=True)
+    writer = threading.Thread(
+        target=_write_stage, args=(write_queue, failures, output_counts, outputs, progress, write_times),
+        daemon=True,
+    )
+    reader.start()
+    writer.start()
+    
+    try:
+        while True:
+            item = read_queue.get()
+            if item is _END_OF_QUEUE:
+                break
+            index, markdown_path, dest_path, markdown, read_seconds = item
+            page_record = None
+            try:
+                if isinstance(markdown, Exception):
+                    raise markdown
+                if markdown is None:
+                    # Too large to hold in memory: streamed straight to disk
+                    result = {"changed": 0, "unchanged": 0}
+                    generate_page(
+                        markdown_path, template_path, dest_path, basepath, variables, block_cache, profiler,
+                        result, outputs, asset_map,
+                    )
+                else:
+                    logger.debug("Generating page from %s to %s using %s", markdown_path, dest_path, template_path)
+                    if profiler is None:
+                        result, _ = render_page(
+                            markdown, template, basepath, variables, block_cache, asset_map=asset_map
+                        )
+                    else:
+                        with profiler.page(markdown_path):
+                            result, _ = render_page(
+                                markdown, template, basepath, variables, block_cache, profiler, asset_map
+                            )
+                        page_record = profiler.pages[-1]
+                        profiler.add_phase(page_record, "read", read_seconds)
+            except Exception as e:
+                result = e
+            write_queue.put((index, markdown_path, dest_path, result, page_record))
+    finally:
+        write_queue.put(_END_OF_QUEUE)
+        writer.join()
+    
+    for page_record, seconds in write_times:
+        profiler.add_phase(page_record, "write", seconds)
+    
+    failures.sort(key=lambda failure: failure[0])
+    return [(markdown_path, error) for _, markdown_path, error in failures]
+
+
+def _generate_pages(pages, template_path, basepath, jobs, variables=None, block_cache=None, profiler=None, pipeline=False,
+                    output_counts=None, outputs=None, asset_map=None):
+    """
+    Generate a list of pages, serially or across a process pool.
+    
+    Every page is attempted even if some fail, so one broken markdown file
+    does not hide errors in the others.
+    
+    Args:
+        pages (list): List of (markdown_path, dest_path) tuples
+        template_path (str): Path to the HTML template file
+        basepath (str): Base path for URLs
+        jobs (int): Number of worker processes; 1 generates in-process
+        variables (dict): Extra template slot values
+        block_cache (BlockCache): Cache of rendered blocks. Each worker
+                                  process gets its own cache with the same
+                                  settings, and their counts and entry
+                                  counts are reported through this one.
+        profiler (BuildProfiler): Records every page; worker processes send
+                                  their page records back to it
+        pipeline (bool): With jobs == 1, overlap reading, rendering and
+                         writing in separate threads
+        output_counts (dict): "changed" and "unchanged" page counts to update
+        outputs (OutputRecorder): Records every page written; worker
+                                  processes send their records back to it
+        asset_map (AssetMap): Fingerprinted asset URLs, see generate_page;
+                              sent to each worker process once
+        
+    Returns:
+        list: (markdown_path, exception) tuples for the pages that failed,
+              in the same order as the input pages
+    """
+    failures = []
+    progress = ProgressCounter(logger, len(pages), "Generated pages")
+    if output_counts is None:
+        output_counts = {"changed": 0, "unchanged": 0}
+    
+    if jobs <= 1 and pipeline:
+        return _generate_pages_pipelined(
+            pages, template_path, basepath, variables, block_cache, profiler, progress, output_counts, outputs,
+            asset_map,
+        )
+    
+    if jobs <= 1 or len(pages) <= 1:
+        for markdown_path, dest_path in pages:
+            try:
+                generate_page(
+                    markdown_path, template_path, dest_path, basepath, variables, block_cache, profiler,
+                    output_counts, outputs, asset_map,
+                )
+            except Exception as e:
+                failures.append((markdown_path, e))
+            progress.advance()
+        return failures
+    
+    if block_cache is None:
+        initargs = (0, None, profiler is not None, asset_map)
+    else:
+        initargs = (block_cache.max_entries, block_cache.cache_dir, profiler is not None, asset_map)
+    
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=initargs) as executor:
+        futures = [
+            executor.submit(
+                _generate_page_in_worker, markdown_path, template_path, dest_path, basepath, variables
+            )
+            for markdown_path, dest_path in pages
+        ]
+        # Collect in submission order so error reports are deterministic
+        for (markdown_path, _), future in zip(pages, futures):
+            error = future.exception()
+            progress.advance()
+            if error is not None:
+                failures.append((markdown_path, error))
+                continue
+            page_counts, page_files, cache_counts, cache_entries, page_record = future.result()
+            for key, count in page_counts.items():
+                output_counts[key] += count
+            if outputs is not None:
+                outputs.merge(page_files)
+            if block_cache is not None:
+                block_cache.add_counts(cache_counts)
+                block_cache.set_worker_entries(*cache_entries)
+            if profiler is not None:
+                profiler.add_page(page_record)
+    
+    return failures
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath="/", manifest_path=None, jobs=1, variables=None, block_cache=None, profiler=None, pipeline=False, outputs=None, asset_map=None):
     """
     Recursively generate HTML pages for all markdown files in a directory.
     
+    When a manifest path is given, pages whose markdown content, template
+    and base path are unchanged since the last build (and whose output
+    still exists) are skipped, and the manifest is updated afterwards.
+    
+    Pages are generated in sorted path order. With jobs > 1 they are
+    distributed across a process pool; failures from every page are
+    collected and reported together.
+    
     Args:
         dir_path_content (str): Path to the content directory containing markdown files
         template_path (str): Path to the HTML template file
         dest_dir_path (str): Path to the destination directory where HTML files should be saved
         basepath (str): Base path for URLs (default: "/")
+        manifest_path (str): Path to the build manifest (default: None, always rebuild)
+        jobs (int): Number of worker processes (default: 1)
+        variables (dict): Extra template slot values (default: None)
+        block_cache (BlockCache): Cache of rendered blocks (default: None)
+        profiler (BuildProfiler): Records the "scan" phase and every page
+                                  (default: None)
+        pipeline (bool): Overlap reading, rendering and writing when jobs
+                         is 1 (default: False)
+        outputs (OutputRecorder): Records every page of the site, including
+                                  the up-to-date pages that are skipped
+                                  (default: None)
+        asset_map (AssetMap): Fingerprinted asset URLs, see generate_page;
+                              a change to the map rebuilds every page
+                              (default: None)
+        
+    Returns:
+        dict: Counts of generated pages whose output "changed" and of those
+              that were "unchanged" and so left untouched
+        
+    Raises:
+        RuntimeError: If one or more pages failed to generate
     """
-    print(f"Generating pages recursively from {dir_path_content} to {dest_dir_path}")
+    logger.info("Generating pages from %s to %s", dir_path_content, dest_dir_path)
     
     # Check if content directory exists
     if not os.path.exists(dir_path_content):
-        print(f"Content directory does not exist: {dir_path_content}")
-        return
-    
-    # Walk through all files and directories in the content directory
-    for root, dirs, files in os.walk(dir_path_content):
-        for file in files:
-            if file.endswith('.md'):
-                # Get the full path to the markdown file
-                markdown_path = os.path.join(root, file)
-                
-                # Calculate the relative path from the content directory
-                rel_path = os.path.relpath(markdown_path, dir_path_content)
-                
-                # Create the destination HTML path
-                # Replace .md extension with .html
-                html_rel_path = rel_path.replace('.md', '.html')
-                dest_path = os.path.join(dest_dir_path, html_rel_path)
-                
-                # Generate the page
-                generate_page(markdown_path, template_path, dest_path, basepath)
-    
-    print("Recursive page generation completed!")
+        logger.warning("Content directory does not exist: %s", dir_path_content)
+        return {"changed": 0, "unchanged": 0}
+    
+    # Finding the pages to build, including manifest hashing, is the "scan" phase
+    with profiler.phase("scan") if profiler is not None else nullcontext():
+        old_manifest = load_manifest(manifest_path)
+        new_manifest = {}
+        template_hash = _template_hash(load_template(template_path, basepath, asset_map), variables)
+        pending = []
+        pending_entries = {}
+        skipped = 0
+        
+        # Walk through all files and directories in the content directory
+        for root, dirs, files in os.walk(dir_path_content):
+            # Sort in place so the walk order (and the output) is deterministic
+            dirs.sort()
+            for file in sorted(files):
+                if file.endswith('.md'):
+                    # Get the full path to the markdown file
+                    markdown_path = os.path.join(root, file)
+                    
+                    # Calculate the relative path from the content directory
+                    rel_path = os.path.relpath(markdown_path, dir_path_content)
+                    
+                    # Create the destination HTML path
+                    # Replace .md extension with .html
+                    html_rel_path = rel_path.replace('.md', '.html')
+                    dest_path = os.path.join(dest_dir_path, html_rel_path)
+                    
+                    if manifest_path is None:
+                        pending.append((markdown_path, dest_path))
+                        continue
+                    
+                    stat = os.stat(markdown_path)
+                    is_current, content_hash = _page_is_current(
+                        old_manifest.get(html_rel_path), stat, markdown_path,
+                        dest_path, template_hash, basepath,
+                    )
+                    if content_hash is None:
+                        content_hash = _hash_file(markdown_path)
+                    
+                    entry = {
+                        "source": rel_path,
+                        "size": stat.st_size,
+                        "mtime_ns": stat.st_mtime_ns,
+                        "content_hash": content_hash,
+                        "template_hash": template_hash,
+                        "basepath": basepath,
+                    }
+                    
+                    if is_current:
+                        skipped += 1
+                        new_manifest[html_rel_path] = entry
+                        if outputs is not None:
+                            outputs.record(dest_path)
+                    else:
+                        pending.append((markdown_path, dest_path))
+                        pending_entries[markdown_path] = (html_rel_path, entry)
+    
+    output_counts = {"changed": 0, "unchanged": 0}
+    failures = _generate_pages(
+        pending, template_path, basepath, jobs, variables, block_cache, profiler, pipeline, output_counts, outputs,
+        asset_map,
+    )
+    failed_paths = {markdown_path for markdown_path, _ in failures}
+    
+    if manifest_path is not None:
+        # Only record pages that were actually generated, so failed pages
+        # are retried on the next build
+        for markdown_path, (html_rel_path, entry) in pending_entries.items():
+            if markdown_path not in failed_paths:
+                new_manifest[html_rel_path] = entry
+        save_manifest(manifest_path, new_manifest)
+    
+    logger.info(
+        "Generated %d page(s) (%d changed, %d unchanged), skipped %d up to date, %d failed",
+        len(pending) - len(failures), output_counts["changed"], output_counts["unchanged"],
+        skipped, len(failures),
+    )
+    if block_cache is not None:
+        logger.info("%s", block_cache.summary())
+    
+    if failures:
+        for markdown_path, error in failures:
+            logger.error("Failed to generate %s: %s", markdown_path, error)
+        raise RuntimeError(f"Failed to generate {len(failures)} page(s)")
+    
+    return output_counts
@@ -0,0 +1,146 @@
+from array import array
+
+
+# Opcodes of the flat document representation
+OPEN = 0   # operand: tag id, attr ref: index into attrs or -1
+TEXT = 1   # operand: index into texts
+CLOSE = 2  # operand: tag id
+
+
+class HTMLDocument:
+    """
+    A compact, array-backed alternative to a tree of HTMLNode objects.
+
+    The document is stored as parallel arrays: one opcode, one operand and
+    one attribute reference per entry. Tag names are interned into a table,
+    text values and attribute dicts live in side lists, so emitting an
+    element allocates no per-node objects. Serializing is a single linear
+    walk over the arrays and produces the same HTML as the equivalent
+    LeafNode/ParentNode tree.
+
+    Documents are built with open(), close(), leaf() and text(), the same
+    calls the markdown block converters make on a tree builder.
+    """
+
+    __slots__ = ("ops", "operands", "attr_refs", "tags", "texts", "attrs", "_tag_ids", "_open_tags")
+
+    # Number of rendered parts joined into each chunk yielded by iter_html
+    CHUNK_PARTS = 512
+
+    def __init__(self):
+        self.ops = array("B")
+        self.operands = array("l")
+        self.attr_refs = array("l")
+        self.tags = []
+        self.texts = []
+        self.attrs = []
+        self._tag_ids = {}
+        self._open_tags = []
+
+    def _intern_tag(self, tag):
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self.tags)
+            self._tag_ids[tag] = tag_id
+            self.tags.append(tag)
+        return tag_id
+
+    def _attr_ref(self, props):
+        if not props:
+            return -1
+        self.attrs.append(props)
+        return len(self.attrs) - 1
+
+    def open(self, tag, props=None):
+        """Start an element; must be matched by close()."""
+        if tag is None:
+            raise ValueError("All parent nodes must have a tag")
+        tag_id = self._intern_tag(tag)
+        self.ops.append(OPEN)
+        self.operands.append(tag_id)
+        self.attr_refs.append(self._attr_ref(props))
+        self._open_tags.append(tag_id)
+
+    def close(self):
+        """End the most recently opened element."""
+        if not self._open_tags:
+            raise ValueError("No open element to close")
+        self.ops.append(CLOSE)
+        self.operands.append(self._open_tags.pop())
+        self.attr_refs.append(-1)
+
+    def text(self, value):
+        """Add raw text (or pre-rendered HTML) at the current position."""
+        if value is None:
+            raise ValueError("All leaf nodes must have a value")
+        self.ops.append(TEXT)
+        self.operands.append(len(self.texts))
+        self.attr_refs.append(-1)
+        self.texts.append(value)
+
+    def leaf(self, tag, value, props=None):
+        """Add an element holding only text, like a LeafNode."""
+        if value is None:
+            raise ValueError("All leaf nodes must have a value")
+        if tag is None:
+            self.text(value)
+            return
+        self.open(tag, props)
+        if value:
+            self.text(value)
+        self.close()
+
+    def clear(self):
+        """
+        Remove all content, keeping the interned tag table and the arrays'
+        allocations, so one document can be reused for many fragments.
+        """
+        del self.ops[:]
+        del self.operands[:]
+        del self.attr_refs[:]
+        self.texts.clear()
+        self.attrs.clear()
+        self._open_tags.clear()
+
+    def __len__(self):
+        return len(self.ops)
+
+    def iter_html(self):
+        """Yield the HTML for the document as a sequence of string chunks."""
+        if self._open_tags:
+            raise ValueError("Document has unclosed elements")
+
+        tags = self.tags
+        texts = self.texts
+        attrs = self.attrs
+        parts = []
+        append = parts.append
+
+        for op, operand, attr_ref in zip(self.ops, self.operands, self.attr_refs):
+            if op == TEXT:
+                append(texts[operand])
+            elif op == OPEN:
+                if attr_ref < 0:
+                    append(f"<{tags[operand]}>")
+                else:
+                    props_html = "".join(f' {key}="{value}"' for key, value in attrs[attr_ref].items())
+                    append(f"<{tags[operand]}{props_html}>")
+            else:
+                append(f"</{tags[operand]}>")
+                if len(parts) >= self.CHUNK_PARTS:
+                    yield "".join(parts)
+                    parts.clear()
+
+        yield "".join(parts)
+
+    def to_html(self):
+        return "".join(self.iter_html())
+
+    def write_html(self, fp):
+        """Write the HTML for the document to a text file object chunk by chunk."""
+        write = fp.write
+        for chunk in self.iter_html():
+            write(chunk)
+
+    def __repr__(self):
+        return f"HTMLDocument({len(self.ops)} ops, {len(self.tags)} tags, {len(self.texts)} texts)"
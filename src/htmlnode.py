@@ -1,4 +1,6 @@
 class HTMLNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
@@ -8,6 +10,16 @@ class HTMLNode:
     def to_html(self):
         raise NotImplementedError("to_html method must be implemented by subclasses")
 
+    def iter_html(self):
+        """Yield the HTML for this node as a sequence of string chunks."""
+        raise NotImplementedError("iter_html method must be implemented by subclasses")
+
+    def write_html(self, fp):
+        """Write the HTML for this node to a text file object chunk by chunk."""
+        write = fp.write
+        for chunk in self.iter_html():
+            write(chunk)
+
     def props_to_html(self):
         if self.props is None:
             return ""
@@ -23,6 +35,8 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
@@ -35,20 +49,90 @@ class LeafNode(HTMLNode):
         
         return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self):
+        yield self.to_html()
+
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
+    # Number of rendered parts joined into each chunk yielded by iter_html
+    CHUNK_PARTS = 512
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def _open_tag(self):
         if self.tag is None:
             raise ValueError("All parent nodes must have a tag")
         
         if self.children is None:
             raise ValueError("Parent node must have children")
         
-        children_html = ""
-        for child in self.children:
-            children_html += child.to_html()
+        return f"<{self.tag}{self.props_to_html()}>"
+
+    def iter_html(self):
+        # Walk the tree with an explicit stack of (tag, child iterator)
+        # pairs instead of recursing, so nesting depth is not limited by
+        # Python's recursion limit. Parts are batched into larger chunks
+        # to keep generator overhead off the per-node cost; every chunk
+        # still holds only complete tags.
+        parts = [self._open_tag()]
+        append = parts.append
+        stack = [(self.tag, iter(self.children))]
+        push = stack.append
+        pop = stack.pop
+        
+        while stack:
+            tag, children = stack[-1]
+            for child in children:
+                if isinstance(child, LeafNode):
+                    append(child.to_html())
+                elif isinstance(child, ParentNode):
+                    append(child._open_tag())
+                    push((child.tag, iter(child.children)))
+                    break
+                else:
+                    append("".join(child.iter_html()))
+            else:
+                pop()
+                append(f"</{tag}>")
+                if len(parts) >= self.CHUNK_PARTS:
+                    yield "".join(parts)
+                    parts.clear()
         
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+        yield "".join(parts)
+
+
+class TreeBuilder:
+    """
+    Build a LeafNode/ParentNode tree from open(), close(), leaf() and text()
+    calls, the same calls used to fill an html_ir.HTMLDocument.
+    """
+    __slots__ = ("_stack", "root")
+
+    def __init__(self):
+        self._stack = []
+        self.root = None
+
+    def _append(self, node):
+        if self._stack:
+            self._stack[-1][2].append(node)
+        else:
+            self.root = node
+
+    def open(self, tag, props=None):
+        self._stack.append((tag, props, []))
+
+    def close(self):
+        tag, props, children = self._stack.pop()
+        self._append(ParentNode(tag, children, props))
+
+    def leaf(self, tag, value, props=None):
+        self._append(LeafNode(tag, value, props))
+
+    def text(self, value):
+        self._append(LeafNode(None, value))
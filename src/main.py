@@ -1,14 +1,114 @@
+import argparse
+import logging
 import os
 import sys
-from copy_static import copy_directory_recursive
+import time
+from contextlib import nullcontext
+from block_cache import BlockCache
+from build_log import configure_logging, get_logger
+from change_manifest import OutputRecorder, load_change_manifest, save_change_manifest
+from copy_static import COPY_MODES, AssetMap, copy_directory_recursive, sync_directory
+from dev_server import SiteRebuilder, serve
 from generate_page import generate_pages_recursive
+from precompress import is_compressible, precompress_files
+from profiler import BuildProfiler
+
+
+DEFAULT_BLOCK_CACHE_ENTRIES = 4096
+
+logger = get_logger(__name__)
+
+
+def _add_build_arguments(parser):
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument("-q", "--quiet", action="store_true",
+                           help="only report warnings and errors")
+    verbosity.add_argument("-v", "--verbose", action="store_true",
+                           help="list every file as it is generated or copied")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="number of worker processes used to generate pages (default: 1)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="read, render and write pages in overlapping stages (with --jobs 1)")
+    parser.add_argument("--clean", action="store_true",
+                        help="compare every static file by content and regenerate every page; "
+                             "only outputs whose content changed are rewritten")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static files by content hash instead of size and mtime")
+    parser.add_argument("--copy-mode", choices=COPY_MODES, default="copy",
+                        help="how static files are copied: regular copy, hard link, "
+                             "reflink or auto (reflink/copy_file_range with fallback)")
+    parser.add_argument("--fingerprint-assets", action="store_true",
+                        help="also copy static assets as name.<hash>.ext and point href/src "
+                             "attributes at those copies, so they can be cached forever")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz (and .br, if brotli is installed) files next to each "
+                             "HTML, CSS and other text output, for servers that send them as is")
+    parser.add_argument("--block-cache", type=int, default=None, metavar="ENTRIES",
+                        help="reuse the HTML of identical markdown blocks, keeping up to "
+                             f"ENTRIES in memory (default: off, or {DEFAULT_BLOCK_CACHE_ENTRIES} "
+                             "with --block-cache-dir)")
+    parser.add_argument("--block-cache-dir", default=None, metavar="DIR",
+                        help="also store rendered blocks in DIR, shared between builds and workers")
+    parser.add_argument("--changes", default=None, metavar="FILE",
+                        help="where to write the files added, modified and deleted since the "
+                             "previous build, for deploys (default: .build_changes.json)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each build phase and page, and print a report of the slowest")
+    parser.add_argument("--profile-json", default=None, metavar="FILE",
+                        help="write the profile as JSON to FILE (implies --profile)")
+    parser.add_argument("--profile-trace", default=None, metavar="FILE",
+                        help="write the profile as a Chrome trace to FILE (implies --profile)")
+
+
+def parse_args(argv):
+    """
+    Parse command line arguments.
+    
+    "main.py [basepath] [options]" builds the site; "main.py serve [options]"
+    builds it and serves docs/ locally.
+    """
+    if argv and argv[0] == "serve":
+        parser = argparse.ArgumentParser(prog="main.py serve", description="Build the site and serve docs/ locally.")
+        parser.add_argument("--host", default="localhost", help="interface to bind (default: localhost)")
+        parser.add_argument("--port", type=int, default=8888, help="port to listen on (default: 8888)")
+        parser.add_argument("--watch", action="store_true",
+                            help="rebuild affected pages and assets when content/, static/ or template.html change")
+        parser.add_argument("--interval", type=float, default=0.5,
+                            help="polling interval in seconds when inotify is unavailable (default: 0.5)")
+        _add_build_arguments(parser)
+        args = parser.parse_args(argv[1:])
+        args.command = "serve"
+        args.basepath = "/"
+        # The incremental rebuilds neither fingerprint assets nor compress
+        # outputs, and would leave the pages and compressed files stale
+        if args.watch and (args.fingerprint_assets or args.precompress):
+            parser.error("--fingerprint-assets and --precompress cannot be used with --watch")
+    else:
+        parser = argparse.ArgumentParser(description="Generate the static site into docs/.")
+        parser.add_argument("basepath", nargs="?", default="/", help='base path for URLs (default: "/")')
+        _add_build_arguments(parser)
+        args = parser.parse_args(argv)
+        args.command = "build"
+    
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.block_cache is not None and args.block_cache < 1:
+        parser.error("--block-cache must be at least 1")
+    if args.profile_json or args.profile_trace:
+        args.profile = True
+    return args
+
+
+def create_block_cache(args):
+    """Return the BlockCache selected on the command line, or None."""
+    if args.block_cache is None and args.block_cache_dir is None:
+        return None
+    return BlockCache(args.block_cache or DEFAULT_BLOCK_CACHE_ENTRIES, args.block_cache_dir)
 
 
 def main():
-    # Get basepath from command line argument, default to "/"
-    basepath = "/"
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
+    args = parse_args(sys.argv[1:])
+    basepath = args.basepath
     
     # Get the project root directory (parent of src)
     current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,20 +119,105 @@ def main():
     docs_dir = os.path.join(project_root, "docs")  # Changed from public to docs
     content_dir = os.path.join(project_root, "content")
     template_path = os.path.join(project_root, "template.html")
+    manifest_path = os.path.join(project_root, ".build_manifest.json")
+    changes_path = args.changes or os.path.join(project_root, ".build_changes.json")
     
-    print("Starting static site generation...")
-    print(f"Project root: {project_root}")
-    print(f"Base path: {basepath}")
-    print()
+    if args.quiet:
+        configure_logging(logging.WARNING)
+    elif args.verbose:
+        configure_logging(logging.DEBUG)
+    else:
+        configure_logging(logging.INFO)
+    
+    start = time.perf_counter()
+    logger.info("Starting static site generation with base path %s and %d job(s)", basepath, args.jobs)
+    logger.debug("Project root: %s", project_root)
+    
+    profiler = BuildProfiler() if args.profile else None
+    
+    # Generated pages and compressed siblings live among the static copies;
+    # the sync must leave them for the page build and precompress stage
+    def keep(path):
+        return path.endswith((".html", ".gz", ".br"))
+    
+    # Every output is recorded as it is written or found up to date, to be
+    # compared with the previous build's outputs at the end
+    outputs = OutputRecorder(docs_dir, load_change_manifest(changes_path))
+    
+    # Filled with the fingerprinted URL of every asset as it is copied
+    fingerprints = {} if args.fingerprint_assets else None
     
     # Copy static files to docs directory
-    copy_directory_recursive(static_dir, docs_dir)
-    print()
+    with profiler.phase("static copy") if profiler is not None else nullcontext():
+        if args.clean:
+            # Forget which pages are up to date, so all of them are rendered
+            # again; identical outputs are still left untouched
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+            copy_directory_recursive(
+                static_dir, docs_dir, args.copy_mode, keep=keep, outputs=outputs,
+                asset_map=fingerprints,
+            )
+        else:
+            # Only copy changed static files, leaving generated pages in place
+            sync_directory(
+                static_dir, docs_dir, args.checksum,
+                keep=keep, copy_mode=args.copy_mode, outputs=outputs,
+                asset_map=fingerprints,
+            )
+    
+    # Frozen for the page build, which keys templates and blocks on its digest
+    asset_map = AssetMap(fingerprints) if fingerprints is not None else None
     
     # Generate all pages recursively from content directory
-    generate_pages_recursive(content_dir, template_path, docs_dir, basepath)
+    generate_pages_recursive(
+        content_dir, template_path, docs_dir, basepath, manifest_path, args.jobs,
+        block_cache=create_block_cache(args), profiler=profiler, pipeline=args.pipeline, outputs=outputs,
+        asset_map=asset_map,
+    )
+    
+    if args.precompress:
+        with profiler.phase("precompress") if profiler is not None else nullcontext():
+            precompress_files(
+                [os.path.join(docs_dir, path) for path in list(outputs.files) if is_compressible(path)],
+                outputs=outputs,
+            )
+    
+    changes = outputs.changes()
+    # Pages whose markdown file is gone are still in docs/, and so are the
+    # compressed siblings of removed outputs (or all of them, once
+    # --precompress is dropped); remove them so docs/ matches the deleted list
+    for entry in changes["deleted"]:
+        stale_path = os.path.join(docs_dir, entry["path"])
+        if os.path.isfile(stale_path):
+            logger.debug("Removing stale file: %s", stale_path)
+            os.remove(stale_path)
+            stale_dir = os.path.dirname(stale_path)
+            if stale_dir != docs_dir and not os.listdir(stale_dir):
+                os.rmdir(stale_dir)
+    save_change_manifest(changes_path, outputs.files, changes)
+    logger.info(
+        "%d file(s) added, %d modified, %d deleted since the previous build; written to %s",
+        len(changes["added"]), len(changes["modified"]), len(changes["deleted"]), changes_path,
+    )
+    
+    if profiler is not None:
+        # The report was asked for, so it is printed even with --quiet
+        print(profiler.report())
+        if args.profile_json:
+            profiler.write_json(args.profile_json)
+            logger.info("Profile written to %s", args.profile_json)
+        if args.profile_trace:
+            profiler.write_chrome_trace(args.profile_trace)
+            logger.info("Trace written to %s", args.profile_trace)
+    
+    logger.info("Static site generation completed in %.2fs", time.perf_counter() - start)
     
-    print("\nStatic site generation completed!")
+    if args.command == "serve":
+        rebuilder = SiteRebuilder(
+            content_dir, static_dir, template_path, docs_dir, basepath, manifest_path, args.copy_mode
+        )
+        serve(rebuilder, args.host, args.port, args.watch, args.interval)
 
 
 if __name__ == "__main__":
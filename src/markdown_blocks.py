@@ -1,10 +1,10 @@
 from enum import Enum
-import re
 
-from htmlnode import ParentNode, LeafNode
-from textnode import TextNode
+from htmlnode import TreeBuilder
+from html_ir import HTMLDocument
+from patterns import HEADING_PATTERN, ORDERED_LIST_ITEM_PATTERN
 from split_nodes import text_to_textnodes
-from text_to_html import text_node_to_html_node
+from text_to_html import text_node_to_html_node, text_node_to_leaf_args
 
 
 class BlockType(Enum):
@@ -16,6 +16,77 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
 
 
+def _finish_block(lines):
+    """
+    Strip a block given as lines, like str.strip() on the joined block.
+    
+    Returns:
+        list: The stripped lines, or None if the block is only whitespace
+    """
+    start = 0
+    end = len(lines)
+    while start < end and not lines[start].strip():
+        start += 1
+    while end > start and not lines[end - 1].strip():
+        end -= 1
+    if start == end:
+        return None
+    
+    block = lines[start:end]
+    block[0] = block[0].lstrip()
+    block[-1] = block[-1].rstrip()
+    return block
+
+
+def iter_block_lines(lines):
+    """
+    Group markdown lines into blocks separated by empty lines.
+    
+    Lines are consumed one at a time, so a file object can be passed in and
+    only the current block is held in memory. Blocks are stripped of
+    surrounding whitespace and empty blocks are skipped, matching
+    markdown_to_blocks.
+    
+    Args:
+        lines (iterable): Lines of markdown, with or without trailing newlines
+        
+    Yields:
+        list: The lines of each block
+    """
+    block = []
+    for line in lines:
+        if line.endswith('\n'):
+            line = line[:-1]
+        if line:
+            block.append(line)
+            continue
+        # An empty line ends the current block
+        if block:
+            finished = _finish_block(block)
+            if finished is not None:
+                yield finished
+            block = []
+    
+    if block:
+        finished = _finish_block(block)
+        if finished is not None:
+            yield finished
+
+
+def iter_blocks(lines):
+    """
+    Scan markdown lines into typed blocks in a single streaming pass.
+    
+    Args:
+        lines (iterable): Lines of markdown, e.g. an open text file
+        
+    Yields:
+        tuple: (BlockType, list of block lines)
+    """
+    for block_lines in iter_block_lines(lines):
+        yield block_lines_to_block_type(block_lines), block_lines
+
+
 def markdown_to_blocks(markdown):
     """
     Split a markdown string into blocks based on double newlines.
@@ -26,17 +97,7 @@ def markdown_to_blocks(markdown):
     Returns:
         list: List of block strings with whitespace stripped and empty blocks removed
     """
-    # Split by double newlines to get blocks
-    blocks = markdown.split('\n\n')
-    
-    # Strip whitespace and filter out empty blocks
-    cleaned_blocks = []
-    for block in blocks:
-        stripped_block = block.strip()
-        if stripped_block:  # Only add non-empty blocks
-            cleaned_blocks.append(stripped_block)
-    
-    return cleaned_blocks
+    return ['\n'.join(lines) for lines in iter_block_lines(markdown.split('\n'))]
 
 
 def block_to_block_type(block):
@@ -49,48 +110,124 @@ def block_to_block_type(block):
     Returns:
         BlockType: The type of the block
     """
-    lines = block.split('\n')
+    return block_lines_to_block_type(block.split('\n'))
+
+
+def block_lines_to_block_type(lines):
+    """
+    Determine the type of a markdown block given as a list of lines.
+    
+    Args:
+        lines (list): The lines of a single block (already stripped)
+        
+    Returns:
+        BlockType: The type of the block
+    """
+    first_line = lines[0]
     
     # Check for heading (1-6 # characters followed by space)
-    if re.match(r'^#{1,6} ', block):
+    if HEADING_PATTERN.match(first_line):
         return BlockType.HEADING
     
     # Check for code block (starts and ends with ```)
-    if block.startswith('```') and block.endswith('```'):
+    if first_line.startswith('```') and lines[-1].endswith('```'):
         return BlockType.CODE
     
-    # Check for quote block (every line starts with >)
-    if all(line.startswith('>') for line in lines):
-        return BlockType.QUOTE
+    # Decide between quote and lists in a single walk over the lines,
+    # giving up as soon as no candidate type is left:
+    # - quote: every line starts with >
+    # - unordered list: every line starts with "- "
+    # - ordered list: every line starts with "N. ", numbered 1, 2, 3, ...
+    is_quote = True
+    is_unordered_list = True
+    is_ordered_list = True
+    
+    for number, line in enumerate(lines, 1):
+        if is_quote and not line.startswith('>'):
+            is_quote = False
+        if is_unordered_list and not line.startswith('- '):
+            is_unordered_list = False
+        if is_ordered_list:
+            match = ORDERED_LIST_ITEM_PATTERN.match(line)
+            if match is None or int(match.group(1)) != number:
+                is_ordered_list = False
+        if not (is_quote or is_unordered_list or is_ordered_list):
+            return BlockType.PARAGRAPH
     
-    # Check for unordered list (every line starts with "- ")
-    if all(line.startswith('- ') for line in lines):
+    if is_quote:
+        return BlockType.QUOTE
+    if is_unordered_list:
         return BlockType.UNORDERED_LIST
+    return BlockType.ORDERED_LIST
+
+
+class DocumentMetadata:
+    """
+    Facts about a markdown document collected while it is parsed, so
+    callers need no second pass over the source.
+    
+    Attributes:
+        title (str): Text of the first "# " line in any block, as found by
+                     extract_title, or None if there is none
+        outline (list): (level, text) for every heading, in document order,
+                        with inline markdown reduced to plain text
+        word_count (int): Whitespace-separated words in the block text,
+                          not counting block markers such as "#", "-" or ">"
+    """
+    
+    __slots__ = ("title", "outline", "word_count")
+    
+    def __init__(self):
+        self.title = None
+        self.outline = []
+        self.word_count = 0
+    
+    def add_block(self, block_type, lines):
+        """Record a parsed block."""
+        if self.title is None:
+            # Like extract_title, any "# " line counts, not just a heading
+            # block's first line; the scan stops once a title is found
+            for line in lines:
+                if line.startswith("# ") and line[2:].strip():
+                    self.title = line[2:].strip()
+                    break
+        if block_type == BlockType.HEADING:
+            level = len(lines[0]) - len(lines[0].lstrip("#"))
+            text = "\n".join(lines)[level + 1:]
+            self.outline.append((level, "".join(node.text for node in text_to_textnodes(text))))
+            self.word_count += len(text.split())
+        elif block_type == BlockType.CODE:
+            self.word_count += len("\n".join(lines)[3:-3].split())
+        elif block_type == BlockType.QUOTE:
+            self.word_count += sum(len(line.lstrip(">").split()) for line in lines)
+        elif block_type == BlockType.PARAGRAPH:
+            self.word_count += sum(len(line.split()) for line in lines)
+        else:
+            # Every list line starts with a single marker word
+            self.word_count += sum(len(line.split()) - 1 for line in lines)
     
-    # Check for ordered list (every line starts with number. followed by space)
-    # Numbers must start at 1 and increment by 1
-    if all(re.match(r'^\d+\. ', line) for line in lines):
-        # Extract the numbers and check if they start at 1 and increment
-        numbers = []
-        for line in lines:
-            match = re.match(r'^(\d+)\. ', line)
-            if match:
-                numbers.append(int(match.group(1)))
+    def require_title(self):
+        """
+        Return the title.
         
-        # Check if numbers start at 1 and increment by 1
-        if numbers == list(range(1, len(numbers) + 1)):
-            return BlockType.ORDERED_LIST
+        Raises:
+            ValueError: If the document has no h1 header
+        """
+        if self.title is None:
+            raise ValueError("No h1 header found in markdown")
+        return self.title
     
-    # Default to paragraph if none of the above match
-    return BlockType.PARAGRAPH
+    def __repr__(self):
+        return f"DocumentMetadata({self.title!r}, {len(self.outline)} headings, {self.word_count} words)"
 
 
-def text_to_children(text):
+def text_to_children(text, basepath="/"):
     """
     Convert text with inline markdown to a list of HTMLNode children.
     
     Args:
         text (str): Text that may contain inline markdown formatting
+        basepath (str): Base path for site-absolute link and image URLs
         
     Returns:
         list[HTMLNode]: List of HTMLNode objects representing the inline content
@@ -98,23 +235,32 @@ def text_to_children(text):
     text_nodes = text_to_textnodes(text)
     children = []
     for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
+        html_node = text_node_to_html_node(text_node, basepath)
         children.append(html_node)
     return children
 
 
-def paragraph_to_html_node(block):
-    """Convert a paragraph block to an HTMLNode."""
-    lines = block.split("\n")
+# The block converters below emit into an output object through open(),
+# close(), leaf() and text() calls. A TreeBuilder turns those calls into
+# LeafNode/ParentNode objects; an HTMLDocument records them in flat arrays.
+
+def _emit_inline(out, text, basepath, asset_map):
+    """Emit the inline content of a block."""
+    for text_node in text_to_textnodes(text):
+        tag, value, props = text_node_to_leaf_args(text_node, basepath, asset_map)
+        out.leaf(tag, value, props)
+
+
+def _emit_paragraph(out, lines, basepath, asset_map):
     paragraph_text = " ".join(lines)
-    children = text_to_children(paragraph_text)
-    return ParentNode("p", children)
+    out.open("p")
+    _emit_inline(out, paragraph_text, basepath, asset_map)
+    out.close()
 
 
-def heading_to_html_node(block):
-    """Convert a heading block to an HTMLNode."""
+def _emit_heading(out, lines, basepath, asset_map):
     level = 0
-    for char in block:
+    for char in lines[0]:
         if char == "#":
             level += 1
         else:
@@ -123,26 +269,26 @@ def heading_to_html_node(block):
     if level < 1 or level > 6:
         raise ValueError(f"Invalid heading level: {level}")
     
-    text = block[level + 1:]  # Skip the hashes and space
-    children = text_to_children(text)
-    return ParentNode(f"h{level}", children)
+    text = "\n".join(lines)[level + 1:]  # Skip the hashes and space
+    out.open(f"h{level}")
+    _emit_inline(out, text, basepath, asset_map)
+    out.close()
 
 
-def code_to_html_node(block):
-    """Convert a code block to an HTMLNode."""
+def _emit_code(out, lines, basepath, asset_map):
+    block = "\n".join(lines)
     if not (block.startswith("```") and block.endswith("```")):
         raise ValueError("Invalid code block")
     
     text = block[3:-3]  # Remove the ``` from start and end
     if text.startswith("\n"):
         text = text[1:]
-    code_node = LeafNode("code", text)
-    return ParentNode("pre", [code_node])
+    out.open("pre")
+    out.leaf("code", text)
+    out.close()
 
 
-def quote_to_html_node(block):
-    """Convert a quote block to an HTMLNode."""
-    lines = block.split("\n")
+def _emit_quote(out, lines, basepath, asset_map):
     new_lines = []
     for line in lines:
         if not line.startswith(">"):
@@ -150,61 +296,190 @@ def quote_to_html_node(block):
         new_lines.append(line.lstrip(">").strip())
     
     content = " ".join(new_lines)
-    children = text_to_children(content)
-    return ParentNode("blockquote", children)
+    out.open("blockquote")
+    _emit_inline(out, content, basepath, asset_map)
+    out.close()
 
 
-def unordered_list_to_html_node(block):
-    """Convert an unordered list block to an HTMLNode."""
-    items = []
-    for line in block.split("\n"):
+def _emit_unordered_list(out, lines, basepath, asset_map):
+    out.open("ul")
+    for line in lines:
         text = line[2:]  # Remove "- " from start
-        children = text_to_children(text)
-        items.append(ParentNode("li", children))
-    return ParentNode("ul", items)
+        out.open("li")
+        _emit_inline(out, text, basepath, asset_map)
+        out.close()
+    out.close()
 
 
-def ordered_list_to_html_node(block):
-    """Convert an ordered list block to an HTMLNode."""
-    items = []
-    for line in block.split("\n"):
+def _emit_ordered_list(out, lines, basepath, asset_map):
+    out.open("ol")
+    for line in lines:
         text = line.split(". ", 1)[1]  # Remove "1. " etc from start
-        children = text_to_children(text)
-        items.append(ParentNode("li", children))
-    return ParentNode("ol", items)
+        out.open("li")
+        _emit_inline(out, text, basepath, asset_map)
+        out.close()
+    out.close()
+
+
+_BLOCK_EMITTERS = {
+    BlockType.PARAGRAPH: _emit_paragraph,
+    BlockType.HEADING: _emit_heading,
+    BlockType.CODE: _emit_code,
+    BlockType.QUOTE: _emit_quote,
+    BlockType.UNORDERED_LIST: _emit_unordered_list,
+    BlockType.ORDERED_LIST: _emit_ordered_list,
+}
+
+
+def _build_node(emit, block, basepath):
+    builder = TreeBuilder()
+    emit(builder, block.split("\n"), basepath, None)
+    return builder.root
+
+
+def paragraph_to_html_node(block, basepath="/"):
+    """Convert a paragraph block to an HTMLNode."""
+    return _build_node(_emit_paragraph, block, basepath)
+
+
+def heading_to_html_node(block, basepath="/"):
+    """Convert a heading block to an HTMLNode."""
+    return _build_node(_emit_heading, block, basepath)
+
+
+def code_to_html_node(block):
+    """Convert a code block to an HTMLNode."""
+    return _build_node(_emit_code, block, "/")
+
+
+def quote_to_html_node(block, basepath="/"):
+    """Convert a quote block to an HTMLNode."""
+    return _build_node(_emit_quote, block, basepath)
+
+
+def unordered_list_to_html_node(block, basepath="/"):
+    """Convert an unordered list block to an HTMLNode."""
+    return _build_node(_emit_unordered_list, block, basepath)
+
+
+def ordered_list_to_html_node(block, basepath="/"):
+    """Convert an ordered list block to an HTMLNode."""
+    return _build_node(_emit_ordered_list, block, basepath)
 
 
-def markdown_to_html_node(markdown):
+def _render_block(block_type, lines, basepath, asset_map):
+    """Render a single block to an HTML string."""
+    document = HTMLDocument()
+    _BLOCK_EMITTERS[block_type](document, lines, basepath, asset_map)
+    return document.to_html()
+
+
+def _emit_block(out, block_type, lines, basepath, metadata=None, cache=None, asset_map=None):
+    emit = _BLOCK_EMITTERS.get(block_type)
+    if emit is None:
+        raise ValueError(f"Invalid block type: {block_type}")
+    if cache is None:
+        emit(out, lines, basepath, asset_map)
+    else:
+        # Cached fragments are already HTML, so they are emitted as raw text
+        out.text(cache.render(block_type, lines, basepath, _render_block, asset_map))
+    if metadata is not None:
+        metadata.add_block(block_type, lines)
+
+
+def _emit_markdown(out, lines, basepath, metadata=None, cache=None, asset_map=None):
+    """Emit a full markdown document, given as lines, wrapped in a div."""
+    out.open("div")
+    for block_type, block_lines in iter_blocks(lines):
+        _emit_block(out, block_type, block_lines, basepath, metadata, cache, asset_map)
+    out.close()
+
+
+def _markdown_lines(markdown):
+    """Accept either a markdown string or an iterable of lines."""
+    if isinstance(markdown, str):
+        return markdown.split('\n')
+    return markdown
+
+
+def markdown_to_html_node(markdown, basepath="/", metadata=None, cache=None, asset_map=None):
     """
     Convert a full markdown document into a single parent HTMLNode.
     
     Args:
-        markdown (str): The markdown text to convert
+        markdown (str): The markdown text to convert, or an iterable of lines
+        basepath (str): Base path prefixed to site-absolute link and image URLs
+        metadata (DocumentMetadata): Filled in during the parse if given
+        cache (BlockCache): Reuses the HTML of previously rendered blocks if given
+        asset_map (AssetMap): Fingerprinted URLs for site-absolute link and
+                              image URLs that point at static assets
         
     Returns:
         HTMLNode: A parent HTMLNode containing all the converted markdown blocks
     """
-    blocks = markdown_to_blocks(markdown)
-    children = []
+    builder = TreeBuilder()
+    _emit_markdown(builder, _markdown_lines(markdown), basepath, metadata, cache, asset_map)
+    return builder.root
+
+
+def markdown_to_document(markdown, basepath="/", metadata=None, cache=None, asset_map=None):
+    """
+    Convert a full markdown document into a flat HTMLDocument.
     
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        
-        if block_type == BlockType.PARAGRAPH:
-            node = paragraph_to_html_node(block)
-        elif block_type == BlockType.HEADING:
-            node = heading_to_html_node(block)
-        elif block_type == BlockType.CODE:
-            node = code_to_html_node(block)
-        elif block_type == BlockType.QUOTE:
-            node = quote_to_html_node(block)
-        elif block_type == BlockType.UNORDERED_LIST:
-            node = unordered_list_to_html_node(block)
-        elif block_type == BlockType.ORDERED_LIST:
-            node = ordered_list_to_html_node(block)
-        else:
-            raise ValueError(f"Invalid block type: {block_type}")
+    Produces the same HTML as markdown_to_html_node without allocating a
+    node object per element.
+    
+    Args:
+        markdown (str): The markdown text to convert, or an iterable of lines
+        basepath (str): Base path prefixed to site-absolute link and image URLs
+        metadata (DocumentMetadata): Filled in during the parse if given
+        cache (BlockCache): Reuses the HTML of previously rendered blocks if given
+        asset_map (AssetMap): Fingerprinted URLs for site-absolute link and
+                              image URLs that point at static assets
         
-        children.append(node)
+    Returns:
+        HTMLDocument: The converted document
+    """
+    document = HTMLDocument()
+    _emit_markdown(document, _markdown_lines(markdown), basepath, metadata, cache, asset_map)
+    return document
+
+
+def iter_markdown_html(lines, basepath="/", metadata=None, cache=None, profiler=None, asset_map=None):
+    """
+    Render markdown to HTML block by block, in bounded memory.
+    
+    Only one block and its rendered HTML are held at a time, so very large
+    generated documents can be streamed from a file object to an output
+    file.
     
-    return ParentNode("div", children)
+    Args:
+        lines (iterable): Lines of markdown, e.g. an open text file
+        basepath (str): Base path prefixed to site-absolute link and image URLs
+        metadata (DocumentMetadata): Filled in as blocks are parsed if given;
+                                     complete once the generator is exhausted
+        cache (BlockCache): Reuses the HTML of previously rendered blocks if given
+        profiler (BuildProfiler): Times the "block split", "inline parse" and
+                                  "serialize" phases if given
+        asset_map (AssetMap): Fingerprinted URLs for site-absolute link and
+                              image URLs that point at static assets
+        
+    Yields:
+        str: Chunks of HTML, together identical to markdown_to_html_node
+    """
+    # One document is cleared and refilled for every block, so the arrays
+    # and tag table are allocated once per page rather than once per block
+    document = HTMLDocument()
+    yield "<div>"
+    if profiler is None:
+        for block_type, block_lines in iter_blocks(lines):
+            document.clear()
+            _emit_block(document, block_type, block_lines, basepath, metadata, cache, asset_map)
+            yield from document.iter_html()
+    else:
+        for block_type, block_lines in profiler.timed_iter("block split", iter_blocks(lines)):
+            document.clear()
+            with profiler.phase("inline parse"):
+                _emit_block(document, block_type, block_lines, basepath, metadata, cache, asset_map)
+            yield from profiler.timed_iter("serialize", document.iter_html())
+    yield "</div>"
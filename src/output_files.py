@@ -0,0 +1,122 @@
+import hashlib
+import os
+import uuid
+
+
+# Bytes read at a time when hashing a file
+READ_BLOCK_SIZE = 1 << 20
+
+
+def file_digest(path):
+    """Return the hex sha256 digest of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(READ_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def temp_path(path):
+    """
+    Return a unique temporary path next to path.
+
+    Temporary files live in the same directory as their target, so they
+    can replace it with an atomic os.replace on the same filesystem.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex[:12]}.tmp")
+
+
+def has_content(path, size, digest):
+    """Check whether path is a regular file with the given size and sha256 digest."""
+    try:
+        if not os.path.isfile(path) or os.path.getsize(path) != size:
+            return False
+    except OSError:
+        return False
+    return file_digest(path) == digest
+
+
+class AtomicWriter:
+    """
+    A text file writer that replaces its target only if the content changed.
+
+    Text is encoded and hashed as it is written to a temporary file next to
+    the target. On commit, the temporary file is discarded if the target
+    already holds the same bytes, so the target keeps its mtime, and
+    otherwise atomically renamed over the target, so readers never see a
+    partly written file.
+
+    Used as a context manager, the file is committed when the block ends
+    without an exception and discarded otherwise; the outcome is left in
+    the changed attribute, and the hex sha256 of the content in digest.
+    """
+
+    def __init__(self, path, encoding='utf-8'):
+        self.path = path
+        self.encoding = encoding
+        self.changed = None
+        self.digest = None
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory, exist_ok=True)
+
+        self._temp_path = temp_path(path)
+        # Created like open(path, 'w') would, so the umask applies
+        fd = os.open(self._temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        self._file = os.fdopen(fd, 'wb')
+        self._digest = hashlib.sha256()
+        self._size = 0
+
+    def write(self, text):
+        data = text.encode(self.encoding)
+        self._digest.update(data)
+        self._size += len(data)
+        self._file.write(data)
+
+    def commit(self):
+        """
+        Finish writing and put the file in place.
+
+        Returns:
+            bool: True if the target was written, False if it already had
+                  the same content
+        """
+        self._file.close()
+        self.digest = self._digest.hexdigest()
+        if has_content(self.path, self._size, self.digest):
+            os.remove(self._temp_path)
+            self.changed = False
+        else:
+            os.replace(self._temp_path, self.path)
+            self.changed = True
+        return self.changed
+
+    def discard(self):
+        """Abandon the file, leaving the target untouched."""
+        self._file.close()
+        if os.path.exists(self._temp_path):
+            os.remove(self._temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+
+def write_if_changed(path, text, encoding='utf-8'):
+    """
+    Write text to path through an AtomicWriter.
+
+    Returns:
+        bool: True if the file was written, False if it was unchanged
+    """
+    with AtomicWriter(path, encoding) as writer:
+        writer.write(text)
+    return writer.changed
@@ -0,0 +1,54 @@
+"""
+Compiled regular expressions shared by the markdown parser and templates.
+
+Every pattern is compiled once at import time; modules import the
+compiled objects from here instead of passing pattern strings to re.
+"""
+import re
+
+
+# Block detection
+
+# Heading: 1-6 # characters followed by a space
+HEADING_PATTERN = re.compile(r"#{1,6} ")
+
+# Ordered list item: a number followed by ". "
+ORDERED_LIST_ITEM_PATTERN = re.compile(r"(\d+)\. ")
+
+
+# Inline detection
+
+# Markdown images: ![alt text](url)
+IMAGE_PATTERN = re.compile(r"!\[([^\]]*)\]\(([^\)]*)\)")
+
+# Markdown links: [anchor text](url), but not images (which start with !)
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\]]*)\]\(([^\)]*)\)")
+
+# Every inline construct in one alternation, tried left to right at each
+# position. The final branch catches delimiters that were never closed.
+#
+# Image alt text and link text never contain a *, _ or ` delimiter, so a
+# link cannot swallow a bold or code span, and link text and URLs never
+# contain "![", so an image always wins over a link around it: the badge
+# [![build](/badge.png)](/ci) is text, an image and text, as it was when
+# images and links were split in separate passes.
+INLINE_PATTERN = re.compile(
+    r"\*\*(?P<bold>.*?)\*\*"
+    r"|\*(?!\*)(?P<italic>.*?)\*"
+    r"|_(?P<underscore>.*?)_"
+    r"|`(?P<code>.*?)`"
+    r"|!\[(?P<image_alt>[^\]*_`]*)\]\((?P<image_url>[^\)]*)\)"
+    r"|\[(?P<link_text>[^\]!*_`]*(?:!(?!\[)[^\]!*_`]*)*)\]"
+    r"\((?P<link_url>[^\)!]*(?:!(?!\[)[^\)!]*)*)\)"
+    r"|(?P<unclosed>\*\*|[*_`])",
+    re.DOTALL,
+)
+
+
+# Templates
+
+# Template slots: {{ Name }}
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# Double-quoted href and src attributes in template literals
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b(href|src)="([^"]*)"')
@@ -0,0 +1,169 @@
+import gzip
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # Optional; only .gz files are written without it
+    brotli = None
+
+from build_log import get_logger
+from output_files import temp_path
+
+
+logger = get_logger(__name__)
+
+
+# Text formats worth compressing; images, fonts and archives already are
+COMPRESSIBLE_EXTENSIONS = (".html", ".htm", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".map")
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+
+def compressors():
+    """
+    Return the available (suffix, compress) pairs.
+
+    .gz is always available; .br is added when the brotli module is
+    installed.
+    """
+    # mtime=0 keeps the gzip header, and so the file, the same across builds
+    available = [(".gz", lambda data: gzip.compress(data, GZIP_LEVEL, mtime=0))]
+    if brotli is not None:
+        available.append((".br", lambda data: brotli.compress(data, quality=BROTLI_QUALITY)))
+    return available
+
+
+def is_compressible(path):
+    return path.endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+def _sibling_is_current(sibling_path, source_stat, source_digest=None, made_from=None):
+    """
+    Check whether a compressed sibling was made from the current source.
+
+    Siblings are given the mtime of their source when written, and
+    unchanged outputs keep their mtime, so a matching mtime means the
+    source was not rewritten since. A source can still change without
+    its mtime changing, e.g. a static file recopied by --checksum keeps
+    the mtime of the original, so when the source's hash is known, the
+    hash of the source the sibling was made from must match it too.
+    """
+    if source_digest is not None and made_from != source_digest:
+        return False
+    try:
+        return os.stat(sibling_path).st_mtime_ns == source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def _write_sibling(sibling_path, data, source_stat):
+    """Atomically write a compressed sibling, stamped with its source's mtime."""
+    tmp_path = temp_path(sibling_path)
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(tmp_path, sibling_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def precompress_file(path, available=None, source_digest=None, made_from=None):
+    """
+    Write compressed siblings (path.gz, path.br) of a file if they are missing
+    or out of date.
+
+    Args:
+        path (str): Path of the file to compress
+        available (list): (suffix, compress) pairs (default: compressors())
+        source_digest (str): Hex sha256 of the file, if known (default: None)
+        made_from (dict): Sibling path to the hex sha256 of the source it
+                          was made from, as recorded by the previous build
+                          (default: None)
+
+    Returns:
+        list: (sibling_path, digest) for every sibling, where digest is the
+              hex sha256 of a sibling that was written, or None for one that
+              was already current
+    """
+    if available is None:
+        available = compressors()
+    if made_from is None:
+        made_from = {}
+    source_stat = os.stat(path)
+    data = None
+    siblings = []
+    for suffix, compress in available:
+        sibling_path = path + suffix
+        if _sibling_is_current(sibling_path, source_stat, source_digest, made_from.get(sibling_path)):
+            siblings.append((sibling_path, None))
+            continue
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+        compressed = compress(data)
+        _write_sibling(sibling_path, compressed, source_stat)
+        siblings.append((sibling_path, hashlib.sha256(compressed).hexdigest()))
+    return siblings
+
+
+def precompress_files(paths, workers=None, outputs=None):
+    """
+    Write .gz (and .br, with brotli installed) siblings for a list of files.
+
+    Files are compressed on a thread pool; zlib and brotli release the GIL
+    while compressing, so the work runs in parallel. Siblings that are
+    already current are left alone, so an incremental build only
+    compresses the files it changed.
+
+    Args:
+        paths (list): Paths of the files to compress
+        workers (int): Number of threads (default: None, the
+                       ThreadPoolExecutor default)
+        outputs (OutputRecorder): Records every sibling with the hash of its
+                                  source. Sources it has recorded are
+                                  checked against the hash their siblings
+                                  were made from in the previous build,
+                                  not only their mtime (default: None)
+
+    Returns:
+        dict: Counts of "compressed" and "unchanged" sibling files
+    """
+    counts = {"compressed": 0, "unchanged": 0}
+    available = compressors()
+    if brotli is None:
+        logger.debug("brotli is not installed; writing .gz files only")
+
+    def compress(path):
+        if outputs is None:
+            return None, precompress_file(path, available)
+        source_digest = outputs.digest(path)
+        made_from = {}
+        for suffix, _ in available:
+            entry = outputs.previous_entry(path + suffix)
+            if entry is not None:
+                made_from[path + suffix] = entry.get("source_sha256")
+        return source_digest, precompress_file(path, available, source_digest, made_from)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # map() yields in input order, so log and outputs order is stable
+        for source_digest, siblings in executor.map(compress, paths):
+            for sibling_path, digest in siblings:
+                if digest is None:
+                    counts["unchanged"] += 1
+                else:
+                    logger.debug("Compressed %s", sibling_path)
+                    counts["compressed"] += 1
+                if outputs is not None:
+                    outputs.record(sibling_path, digest, source_sha256=source_digest)
+
+    logger.info(
+        "Precompressed %d file(s): %d written, %d unchanged",
+        len(paths), counts["compressed"], counts["unchanged"],
+    )
+    return counts
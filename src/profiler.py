@@ -0,0 +1,184 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+class BuildProfiler:
+    """
+    Record where build time goes, per phase and per page.
+
+    Phases nest: time spent in an inner phase is not counted again in the
+    phase around it, so phase totals add up to the profiled time. Phases
+    entered while a page is being generated are also recorded against that
+    page.
+
+    Page records are plain dicts, so worker processes can profile their
+    pages and send the records back with add_page().
+    """
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.phase_totals = {}
+        self.pages = []
+        self.spans = []
+        self._stack = []
+        self._page_phases = None
+
+    def _enter(self, name):
+        self._stack.append([name, time.perf_counter(), 0.0])
+
+    def _exit(self):
+        name, start, child_time = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        exclusive = elapsed - child_time
+        self.phase_totals[name] = self.phase_totals.get(name, 0.0) + exclusive
+        if self._page_phases is not None:
+            self._page_phases[name] = self._page_phases.get(name, 0.0) + exclusive
+        if self._stack:
+            self._stack[-1][2] += elapsed
+        elif self._page_phases is None:
+            self.spans.append((name, start, elapsed))
+
+    @contextmanager
+    def phase(self, name):
+        """Time the body of a with statement as the named phase."""
+        self._enter(name)
+        try:
+            yield
+        finally:
+            self._exit()
+
+    def timed_iter(self, name, iterable):
+        """Yield from an iterable, timing each step as the named phase."""
+        iterator = iter(iterable)
+        while True:
+            self._enter(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self._exit()
+            yield item
+
+    def read_lines(self, fp, size_hint=65536):
+        """Yield the lines of a text file, timing the reads as the "read" phase."""
+        while True:
+            self._enter("read")
+            try:
+                lines = fp.readlines(size_hint)
+            finally:
+                self._exit()
+            if not lines:
+                return
+            yield from lines
+
+    @contextmanager
+    def page(self, path):
+        """Time the generation of one page."""
+        phases = {}
+        self._page_phases = phases
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._page_phases = None
+            self.pages.append({
+                "page": path,
+                "pid": os.getpid(),
+                "start": start,
+                "seconds": time.perf_counter() - start,
+                "phases": phases,
+            })
+
+    def add_phase(self, record, name, seconds):
+        """
+        Add time spent on a page outside page() to its record, e.g. in
+        another thread. The page's own seconds are left as they are, since
+        that time overlapped its other work.
+        """
+        record["phases"][name] = record["phases"].get(name, 0.0) + seconds
+        self.phase_totals[name] = self.phase_totals.get(name, 0.0) + seconds
+
+    def add_page(self, record):
+        """Add a page record profiled elsewhere, e.g. in a worker process."""
+        self.pages.append(record)
+        for name, seconds in record["phases"].items():
+            self.phase_totals[name] = self.phase_totals.get(name, 0.0) + seconds
+
+    def sorted_pages(self):
+        """Return the page records, slowest first."""
+        return sorted(self.pages, key=lambda record: record["seconds"], reverse=True)
+
+    def report(self, top=10):
+        """
+        Return a text report of phase totals and the slowest pages.
+
+        Args:
+            top (int): Number of pages to list (default: 10)
+        """
+        wall = time.perf_counter() - self.origin
+        profiled = sum(self.phase_totals.values())
+        lines = [f"Build profile: {wall:.3f}s wall, {len(self.pages)} page(s)"]
+
+        lines.append(f"{'phase':<14} {'seconds':>9} {'share':>7}")
+        for name, seconds in sorted(self.phase_totals.items(), key=lambda item: item[1], reverse=True):
+            share = seconds / profiled if profiled else 0.0
+            lines.append(f"{name:<14} {seconds:>9.4f} {share:>7.1%}")
+
+        if self.pages:
+            lines.append("Slowest pages:")
+            lines.append(f"{'seconds':>9}  {'main phase':<14} page")
+            for record in self.sorted_pages()[:top]:
+                phases = record["phases"]
+                main_phase = max(phases, key=phases.get) if phases else "-"
+                lines.append(f"{record['seconds']:>9.4f}  {main_phase:<14} {record['page']}")
+        return "\n".join(lines)
+
+    def to_json(self):
+        """Return the profile as a JSON-serializable dict."""
+        return {
+            "wall_seconds": time.perf_counter() - self.origin,
+            "phases": dict(sorted(self.phase_totals.items(), key=lambda item: item[1], reverse=True)),
+            "pages": [
+                {"page": record["page"], "seconds": record["seconds"], "phases": record["phases"]}
+                for record in self.sorted_pages()
+            ],
+        }
+
+    def to_chrome_trace(self):
+        """
+        Return the profile in the Chrome trace event format, for
+        chrome://tracing or Perfetto.
+
+        Build-level phases and pages become complete ("X") events; each
+        page event carries its phase breakdown in args.
+        """
+        def microseconds(seconds):
+            return round(seconds * 1e6, 3)
+
+        events = []
+        pid = os.getpid()
+        for name, start, seconds in self.spans:
+            events.append({
+                "name": name, "cat": "phase", "ph": "X", "pid": pid, "tid": pid,
+                "ts": microseconds(start - self.origin), "dur": microseconds(seconds),
+            })
+        for record in self.pages:
+            events.append({
+                "name": record["page"], "cat": "page", "ph": "X", "pid": pid, "tid": record["pid"],
+                "ts": microseconds(record["start"] - self.origin), "dur": microseconds(record["seconds"]),
+                "args": {name: microseconds(seconds) for name, seconds in record["phases"].items()},
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_json(self, path):
+        """Write the JSON profile to a file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=1)
+
+    def write_chrome_trace(self, path):
+        """Write the Chrome trace to a file."""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f)
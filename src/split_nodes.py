@@ -1,5 +1,5 @@
 from textnode import TextNode, TextType
-from extract_markdown import extract_markdown_images, extract_markdown_links
+from patterns import IMAGE_PATTERN, INLINE_PATTERN, LINK_PATTERN
 
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -34,7 +34,13 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
     return new_nodes
 
 
-def split_nodes_image(old_nodes):
+def _split_nodes_pattern(old_nodes, pattern, text_type):
+    """
+    Split TEXT nodes around every match of a two-group (text, url) pattern.
+    
+    Works from the match offsets, so each node's text is scanned once and
+    every slice is taken straight from the original string.
+    """
     new_nodes = []
     
     for old_node in old_nodes:
@@ -43,106 +49,87 @@ def split_nodes_image(old_nodes):
             new_nodes.append(old_node)
             continue
         
-        # Extract all images from the text
-        images = extract_markdown_images(old_node.text)
+        text = old_node.text
+        position = 0
         
-        # If no images found, add the node as-is
-        if not images:
-            new_nodes.append(old_node)
-            continue
-        
-        # Process the text, splitting around images
-        current_text = old_node.text
-        
-        for alt_text, url in images:
-            # Find the full markdown syntax for this image
-            image_markdown = f"![{alt_text}]({url})"
-            
-            # Split the current text around this image
-            parts = current_text.split(image_markdown, 1)
+        for match in pattern.finditer(text):
+            start = match.start()
             
-            # Add the text before the image (if any)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
+            # Add the text before the match (if any)
+            if start > position:
+                new_nodes.append(TextNode(text[position:start], TextType.TEXT))
             
-            # Add the image node
-            new_nodes.append(TextNode(alt_text, TextType.IMAGE, url))
-            
-            # Continue with the rest of the text
-            current_text = parts[1] if len(parts) > 1 else ""
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            position = match.end()
         
-        # Add any remaining text after all images
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
+        if position == 0:
+            # No matches found, add the node as-is
+            new_nodes.append(old_node)
+        elif position < len(text):
+            # Add any remaining text after the last match
+            new_nodes.append(TextNode(text[position:], TextType.TEXT))
     
     return new_nodes
 
 
+def split_nodes_image(old_nodes):
+    return _split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
+
+
 def split_nodes_link(old_nodes):
-    new_nodes = []
-    
-    for old_node in old_nodes:
-        # If the node is not a TEXT type, just add it as-is
-        if old_node.text_type != TextType.TEXT:
-            new_nodes.append(old_node)
-            continue
-        
-        # Extract all links from the text
-        links = extract_markdown_links(old_node.text)
-        
-        # If no links found, add the node as-is
-        if not links:
-            new_nodes.append(old_node)
-            continue
-        
-        # Process the text, splitting around links
-        current_text = old_node.text
-        
-        for anchor_text, url in links:
-            # Find the full markdown syntax for this link
-            link_markdown = f"[{anchor_text}]({url})"
-            
-            # Split the current text around this link
-            parts = current_text.split(link_markdown, 1)
-            
-            # Add the text before the link (if any)
-            if parts[0]:
-                new_nodes.append(TextNode(parts[0], TextType.TEXT))
-            
-            # Add the link node
-            new_nodes.append(TextNode(anchor_text, TextType.LINK, url))
-            
-            # Continue with the rest of the text
-            current_text = parts[1] if len(parts) > 1 else ""
-        
-        # Add any remaining text after all links
-        if current_text:
-            new_nodes.append(TextNode(current_text, TextType.TEXT))
-    
-    return new_nodes
+    return _split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+
+_DELIMITED_TYPES = {
+    "bold": TextType.BOLD,
+    "italic": TextType.ITALIC,
+    "underscore": TextType.ITALIC,
+    "code": TextType.CODE,
+}
 
 
 def text_to_textnodes(text):
     """
     Convert raw markdown text to a list of TextNode objects.
     
-    This function applies all markdown parsing in sequence:
-    1. Start with a single TEXT node
-    2. Split bold (**text**)
-    3. Split italic (*text*)  
-    4. Split code (`text`)
-    5. Split images (![alt](url))
-    6. Split links ([text](url))
+    The text is tokenized in a single left-to-right scan that recognizes:
+    - bold (**text**)
+    - italic (*text* and _text_)
+    - code (`text`)
+    - images (![alt](url))
+    - links ([text](url))
+    
+    Whichever construct starts first wins, so delimiters inside code spans
+    and link URLs are left alone.
+    
+    Raises:
+        ValueError: If a **, *, _ or ` delimiter is not closed
     """
-    # Start with a single TEXT node containing all the text
-    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = []
+    position = 0
+    
+    for match in INLINE_PATTERN.finditer(text):
+        start = match.start()
+        if start > position:
+            nodes.append(TextNode(text[position:start], TextType.TEXT))
+        position = match.end()
+        
+        kind = match.lastgroup
+        if kind == "unclosed":
+            raise ValueError("Invalid markdown, formatted section not closed")
+        if kind == "image_url":
+            nodes.append(TextNode(match.group("image_alt"), TextType.IMAGE, match.group("image_url")))
+            continue
+        if kind == "link_url":
+            nodes.append(TextNode(match.group("link_text"), TextType.LINK, match.group("link_url")))
+            continue
+        
+        content = match.group(kind)
+        # Empty sections such as "****" produce no node
+        if content:
+            nodes.append(TextNode(content, _DELIMITED_TYPES[kind]))
     
-    # Apply all the splitting functions in sequence
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    if position < len(text):
+        nodes.append(TextNode(text[position:], TextType.TEXT))
     
     return nodes
@@ -0,0 +1,133 @@
+import hashlib
+import os
+
+from patterns import SLOT_PATTERN, URL_ATTRIBUTE_PATTERN
+
+
+class Template:
+    """
+    An HTML template pre-split into literal segments and named slots.
+
+    The template source is parsed once; rendering is a single pass that
+    interleaves the literals with the slot values. Absolute href="/ and
+    src="/ URLs in the literals are rewritten for the base path up front.
+
+    With an asset map, href and src attributes in the literals that point
+    at a mapped asset are rewritten to its fingerprinted URL up front too.
+    Rendered content is not rewritten; its link and image URLs are mapped
+    as they are emitted (see apply_basepath).
+    """
+
+    def __init__(self, source, basepath="/", asset_map=None):
+        self.source = source
+        self.basepath = basepath
+        self.asset_map = asset_map
+        digest = hashlib.sha256(source.encode("utf-8"))
+        if asset_map:
+            # Pages depend on the asset names, so a renamed asset rebuilds them
+            digest.update(asset_map.digest.encode("utf-8"))
+        self.digest = digest.hexdigest()
+
+        # Remove trailing slash from basepath to avoid double slashes
+        clean_basepath = basepath.rstrip('/')
+
+        # Asset URLs as they appear in the literals once the base path is applied
+        self._url_rewrites = {
+            clean_basepath + url: clean_basepath + fingerprinted_url
+            for url, fingerprinted_url in (asset_map or {}).items()
+        }
+
+        # literals[i] is the text before slots[i]; the final literal
+        # follows the last slot. The source text of each slot is kept for
+        # slots that are given no value.
+        self.literals = []
+        self.slots = []
+        self._slot_sources = []
+        position = 0
+        for match in SLOT_PATTERN.finditer(source):
+            self.literals.append(source[position:match.start()])
+            self.slots.append(match.group(1))
+            self._slot_sources.append(match.group(0))
+            position = match.end()
+        self.literals.append(source[position:])
+
+        self.literals = [
+            literal.replace('href="/', f'href="{clean_basepath}/').replace('src="/', f'src="{clean_basepath}/')
+            for literal in self.literals
+        ]
+        if self._url_rewrites:
+            self.literals = [URL_ATTRIBUTE_PATTERN.sub(self._rewrite_match, literal) for literal in self.literals]
+
+    def _rewrite_match(self, match):
+        url = self._url_rewrites.get(match.group(2))
+        if url is None:
+            return match.group(0)
+        return f'{match.group(1)}="{url}"'
+
+    def iter_render(self, values):
+        """
+        Yield the rendered template as a sequence of string chunks.
+
+        Args:
+            values (dict): Slot name to value. A value is either a string or
+                           a callable returning an iterable of string chunks,
+                           which lets large content be streamed. Slots
+                           without a value are left as written, e.g. for
+                           {{ ... }} syntax meant for client-side tooling.
+        """
+        literals = self.literals
+        for i, name in enumerate(self.slots):
+            yield literals[i]
+            value = values.get(name)
+            if value is None:
+                yield self._slot_sources[i]
+            elif isinstance(value, str):
+                yield value
+            else:
+                yield from value()
+        yield literals[-1]
+
+    def render(self, values):
+        """Render the template to a single string."""
+        return "".join(self.iter_render(values))
+
+    def write(self, fp, values):
+        """Render the template straight to a text file object."""
+        write = fp.write
+        for chunk in self.iter_render(values):
+            write(chunk)
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots}, {self.basepath})"
+
+
+# Compiled templates keyed by (path, basepath, asset map digest), each stored with
+# the (mtime_ns, size) of the file it was read from
+_template_cache = {}
+
+
+def load_template(template_path, basepath="/", asset_map=None):
+    """
+    Load and compile a template file, reusing the compiled template while
+    the file is unchanged.
+
+    Args:
+        template_path (str): Path to the HTML template file
+        basepath (str): Base path for URLs (default: "/")
+        asset_map (AssetMap): Site-absolute asset URLs to their
+                              fingerprinted URLs (default: None)
+
+    Returns:
+        Template: The compiled template
+    """
+    key = (os.path.abspath(template_path), basepath, asset_map.digest if asset_map else None)
+    stat = os.stat(template_path)
+    cached = _template_cache.get(key)
+    if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+        return cached[1]
+
+    with open(template_path, 'r', encoding='utf-8') as f:
+        template = Template(f.read(), basepath, asset_map)
+
+    _template_cache[key] = ((stat.st_mtime_ns, stat.st_size), template)
+    return template
@@ -0,0 +1,154 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from block_cache import BlockCache
+from copy_static import AssetMap
+from generate_page import generate_pages_recursive
+from markdown_blocks import BlockType, markdown_to_document, markdown_to_html_node
+
+
+MARKDOWN = """
+# Title
+
+Shared **footer** with a [link](/about).
+
+- one
+- two
+
+Shared **footer** with a [link](/about).
+
+```
+code sample
+```
+
+Shared **footer** with a [link](/about).
+"""
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self.renders = []
+
+    def _render(self, block_type, lines, basepath, asset_map):
+        self.renders.append(lines)
+        return f"<{block_type.value}>{basepath}</{block_type.value}>"
+
+    def test_identical_blocks_render_once(self):
+        cache = BlockCache()
+        first = cache.render(BlockType.PARAGRAPH, ["text"], "/", self._render)
+        second = cache.render(BlockType.PARAGRAPH, ["text"], "/", self._render)
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.renders), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_key_covers_type_basepath_and_asset_map(self):
+        cache = BlockCache()
+        cache.render(BlockType.PARAGRAPH, ["text"], "/", self._render)
+        cache.render(BlockType.QUOTE, ["text"], "/", self._render)
+        cache.render(BlockType.PARAGRAPH, ["text"], "/blog/", self._render)
+        cache.render(BlockType.PARAGRAPH, ["text"], "/", self._render, AssetMap({"/a.css": "/a.0123456789.css"}))
+        cache.render(BlockType.PARAGRAPH, ["text"], "/", self._render, AssetMap({"/a.css": "/a.abcdef0123.css"}))
+        self.assertEqual(cache.misses, 5)
+        self.assertEqual(cache.hits, 0)
+
+    def test_least_recently_used_is_evicted(self):
+        cache = BlockCache(max_entries=2)
+        cache.render(BlockType.PARAGRAPH, ["a"], "/", self._render)
+        cache.render(BlockType.PARAGRAPH, ["b"], "/", self._render)
+        cache.render(BlockType.PARAGRAPH, ["a"], "/", self._render)
+        cache.render(BlockType.PARAGRAPH, ["c"], "/", self._render)
+        self.assertEqual(len(cache), 2)
+        # "b" was least recently used
+        cache.render(BlockType.PARAGRAPH, ["a"], "/", self._render)
+        cache.render(BlockType.PARAGRAPH, ["b"], "/", self._render)
+        self.assertEqual(self.renders, [["a"], ["b"], ["c"], ["b"]])
+
+    def test_invalid_size(self):
+        with self.assertRaises(ValueError):
+            BlockCache(max_entries=0)
+
+    def test_empty_hit_rate(self):
+        self.assertEqual(BlockCache().hit_rate, 0.0)
+
+    def test_disk_cache_is_shared(self):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            BlockCache(cache_dir=cache_dir).render(BlockType.PARAGRAPH, ["text"], "/", self._render)
+            cache = BlockCache(cache_dir=cache_dir)
+            html = cache.render(BlockType.PARAGRAPH, ["text"], "/", self._render)
+        finally:
+            shutil.rmtree(cache_dir)
+        self.assertEqual(html, "<paragraph>/</paragraph>")
+        self.assertEqual(len(self.renders), 1)
+        self.assertEqual(cache.disk_hits, 1)
+        self.assertEqual(cache.hit_rate, 1.0)
+
+    def test_add_counts(self):
+        cache = BlockCache()
+        cache.add_counts((3, 1, 2))
+        self.assertEqual(cache.counts(), (3, 1, 2))
+        self.assertEqual(cache.lookups, 6)
+
+    def test_summary_counts_worker_entries(self):
+        cache = BlockCache(max_entries=10)
+        self.assertIn("0/10 entries", cache.summary())
+        cache.set_worker_entries(101, 3)
+        cache.set_worker_entries(102, 4)
+        cache.set_worker_entries(101, 5)
+        self.assertIn("9/20 entries in 2 worker(s)", cache.summary())
+
+
+class TestCachedConversion(unittest.TestCase):
+    def test_same_html_as_uncached(self):
+        cache = BlockCache()
+        expected = markdown_to_html_node(MARKDOWN, "/blog/").to_html()
+        self.assertEqual(markdown_to_html_node(MARKDOWN, "/blog/", cache=cache).to_html(), expected)
+        self.assertEqual(markdown_to_document(MARKDOWN, "/blog/", cache=cache).to_html(), expected)
+        self.assertEqual(cache.misses, 4)
+        self.assertEqual(cache.hits, 8)
+
+    def test_asset_urls_in_cached_blocks(self):
+        cache = BlockCache()
+        asset_map = AssetMap({"/about": "/about.0123456789"})
+        expected = markdown_to_html_node(MARKDOWN, "/blog/", asset_map=asset_map).to_html()
+        self.assertIn('href="/blog/about.0123456789"', expected)
+        self.assertEqual(markdown_to_document(MARKDOWN, "/blog/", cache=cache, asset_map=asset_map).to_html(), expected)
+        self.assertNotEqual(markdown_to_document(MARKDOWN, "/blog/", cache=cache).to_html(), expected)
+
+    def test_pages_share_cache(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            content_dir = os.path.join(tmp_dir, "content")
+            dest_dir = os.path.join(tmp_dir, "docs")
+            template_path = os.path.join(tmp_dir, "template.html")
+            os.makedirs(content_dir)
+            with open(template_path, "w", encoding="utf-8") as f:
+                f.write("{{ Title }}{{ Content }}")
+            for name in ("a", "b", "c"):
+                with open(os.path.join(content_dir, f"{name}.md"), "w", encoding="utf-8") as f:
+                    f.write(f"# Page {name}\n\nShared footer")
+
+            for jobs in (1, 2):
+                cache = BlockCache()
+                with self.assertLogs("statichtml", "INFO") as logs:
+                    generate_pages_recursive(content_dir, template_path, dest_dir, "/", None, jobs, block_cache=cache)
+                self.assertEqual(cache.lookups, 6)
+                if jobs == 1:
+                    # The footer is rendered once and reused twice
+                    self.assertEqual(cache.hits, 2)
+                else:
+                    # The entries live in the workers' caches
+                    self.assertEqual(len(cache), 0)
+                    self.assertNotIn(" 0/", cache.summary())
+                self.assertTrue(any("Block cache:" in line for line in logs.output))
+                with open(os.path.join(dest_dir, "b.html"), "r", encoding="utf-8") as f:
+                    self.assertEqual(f.read(), "Page b<div><h1>Page b</h1><p>Shared footer</p></div>")
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import logging
+import time
+import unittest
+from io import StringIO
+
+import build_log
+from build_log import LOGGER_NAME, BufferedStreamHandler, ProgressCounter, configure_logging, get_logger
+
+
+class TestConfigureLogging(unittest.TestCase):
+    def tearDown(self):
+        logger = logging.getLogger(LOGGER_NAME)
+        for handler in list(logger.handlers):
+            if not isinstance(handler, logging.NullHandler):
+                logger.removeHandler(handler)
+        logger.setLevel(logging.NOTSET)
+        logger.propagate = True
+
+    def _log_everything(self):
+        logger = get_logger("test")
+        logger.debug("debug line")
+        logger.info("info line")
+        logger.warning("warning line")
+
+    def test_default_level_hides_debug(self):
+        stream = StringIO()
+        configure_logging(stream=stream)
+        self._log_everything()
+        logging.getLogger(LOGGER_NAME).handlers[-1].flush()
+        self.assertEqual(stream.getvalue(), "info line\nwarning line\n")
+
+    def test_quiet(self):
+        stream = StringIO()
+        configure_logging(logging.WARNING, stream)
+        self._log_everything()
+        self.assertEqual(stream.getvalue(), "warning line\n")
+
+    def test_verbose(self):
+        stream = StringIO()
+        configure_logging(logging.DEBUG, stream)
+        self._log_everything()
+        logging.getLogger(LOGGER_NAME).handlers[-1].flush()
+        self.assertEqual(stream.getvalue(), "debug line\ninfo line\nwarning line\n")
+
+    def test_reconfigure_replaces_handler(self):
+        first = StringIO()
+        second = StringIO()
+        configure_logging(stream=first)
+        configure_logging(stream=second)
+        get_logger("test").warning("once")
+        self.assertEqual(first.getvalue(), "")
+        self.assertEqual(second.getvalue(), "once\n")
+
+
+class FlushCountingStream(StringIO):
+    def __init__(self):
+        super().__init__()
+        self.flushes = 0
+
+    def flush(self):
+        self.flushes += 1
+
+
+class TestBufferedStreamHandler(unittest.TestCase):
+    def test_flushes_for_warnings_only(self):
+        stream = FlushCountingStream()
+        logger = logging.getLogger("test_build_log.buffered")
+        logger.propagate = False
+        logger.setLevel(logging.INFO)
+        handler = BufferedStreamHandler(stream)
+        logger.addHandler(handler)
+        try:
+            for i in range(100):
+                logger.info("line %d", i)
+            self.assertEqual(stream.flushes, 0)
+            logger.error("failed")
+        finally:
+            logger.removeHandler(handler)
+        self.assertEqual(stream.flushes, 1)
+        self.assertEqual(stream.getvalue().count("\n"), 101)
+
+
+    def test_quiet_period_is_flushed_by_timer(self):
+        stream = FlushCountingStream()
+        handler = BufferedStreamHandler(stream)
+        record = logging.makeLogRecord({"msg": "Serving docs/", "levelno": logging.INFO})
+        interval = build_log.FLUSH_INTERVAL
+        build_log.FLUSH_INTERVAL = 0.05
+        try:
+            handler.handle(record)
+            self.assertEqual(stream.flushes, 0)
+            time.sleep(0.3)
+        finally:
+            build_log.FLUSH_INTERVAL = interval
+            handler.close()
+        self.assertGreaterEqual(stream.flushes, 1)
+
+
+class TestProgressCounter(unittest.TestCase):
+    def test_reports_at_most_once_per_interval(self):
+        logger = get_logger("test")
+        progress = ProgressCounter(logger, 3, "Done", interval=0)
+        with self.assertLogs(LOGGER_NAME, "INFO") as logs:
+            for _ in range(3):
+                progress.advance()
+        self.assertEqual([line.split(":")[-1] for line in logs.output], ["Done 1/3", "Done 2/3", "Done 3/3"])
+
+    def test_quiet_before_first_interval(self):
+        progress = ProgressCounter(get_logger("test"), 3, "Done", interval=3600)
+        with self.assertNoLogs(LOGGER_NAME, "INFO"):
+            progress.advance(3)
+        self.assertEqual(progress.count, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from change_manifest import OutputRecorder, load_change_manifest, save_change_manifest
+
+
+def sha256(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TestOutputRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp_dir, "docs")
+        self.manifest_path = os.path.join(self.tmp_dir, "changes.json")
+        os.makedirs(os.path.join(self.root, "blog"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def _build(self, files):
+        """Record files as one build and save it, returning the changes."""
+        outputs = OutputRecorder(self.root, load_change_manifest(self.manifest_path))
+        for rel_path in files:
+            outputs.record(os.path.join(self.root, rel_path))
+        changes = outputs.changes()
+        save_change_manifest(self.manifest_path, outputs.files, changes)
+        return changes
+
+    def test_first_build_adds_everything(self):
+        self._write("index.html", "home")
+        self._write("blog/post.html", "post")
+        changes = self._build(["index.html", "blog/post.html"])
+        self.assertEqual(
+            changes["added"],
+            [
+                {"path": "blog/post.html", "sha256": sha256("post")},
+                {"path": "index.html", "sha256": sha256("home")},
+            ],
+        )
+        self.assertEqual(changes["modified"], [])
+        self.assertEqual(changes["deleted"], [])
+
+    def test_modified_and_deleted(self):
+        self._write("index.html", "home")
+        self._write("blog/post.html", "post")
+        self._build(["index.html", "blog/post.html"])
+        self._write("index.html", "new home")
+        changes = self._build(["index.html"])
+        self.assertEqual(changes["added"], [])
+        self.assertEqual(changes["modified"], [{"path": "index.html", "sha256": sha256("new home")}])
+        self.assertEqual(changes["deleted"], [{"path": "blog/post.html", "sha256": sha256("post")}])
+
+    def test_rewritten_with_same_content_is_unchanged(self):
+        path = self._write("index.html", "home")
+        self._build(["index.html"])
+        self._write("index.html", "home")
+        os.utime(path, ns=(0, 0))
+        self.assertEqual(self._build(["index.html"]), {"added": [], "modified": [], "deleted": []})
+
+    def test_known_hash_is_reused(self):
+        path = self._write("index.html", "home")
+        self._build(["index.html"])
+        outputs = OutputRecorder(self.root, load_change_manifest(self.manifest_path))
+        # A matching size and mtime is trusted, so the file is not read
+        outputs.previous["index.html"]["sha256"] = "cached"
+        outputs.record(path)
+        self.assertEqual(outputs.files["index.html"]["sha256"], "cached")
+        outputs.record(path, "given")
+        self.assertEqual(outputs.files["index.html"]["sha256"], "given")
+
+    def test_merge_relativizes_worker_paths(self):
+        path = self._write("blog/post.html", "post")
+        worker = OutputRecorder()
+        worker.record(path, sha256("post"))
+        outputs = OutputRecorder(self.root)
+        outputs.merge(worker.files)
+        self.assertEqual(list(outputs.files), ["blog/post.html"])
+
+    def test_corrupt_manifest_is_ignored(self):
+        with open(self.manifest_path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertEqual(load_change_manifest(self.manifest_path), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
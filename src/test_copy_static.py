@@ -0,0 +1,252 @@
+import errno
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from change_manifest import OutputRecorder
+from copy_static import copy_directory_recursive, copy_file, sync_directory
+
+
+class CopyStaticTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.tmp_dir, "static")
+        self.dest_dir = os.path.join(self.tmp_dir, "docs")
+        os.makedirs(os.path.join(self.source_dir, "images"))
+        self._write(os.path.join(self.source_dir, "index.css"), "body {}")
+        self._write(os.path.join(self.source_dir, "images", "tom.png"), "png")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def _read(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _sync(self, **kwargs):
+        return sync_directory(self.source_dir, self.dest_dir, **kwargs)
+
+
+class TestCopyDirectoryRecursive(CopyStaticTestCase):
+    def test_copies_and_cleans(self):
+        os.makedirs(self.dest_dir)
+        self._write(os.path.join(self.dest_dir, "old.txt"), "old")
+        copy_directory_recursive(self.source_dir, self.dest_dir)
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "images", "tom.png")), "png")
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "old.txt")))
+
+    def test_matching_files_are_not_rewritten(self):
+        copy_directory_recursive(self.source_dir, self.dest_dir)
+        dest_path = os.path.join(self.dest_dir, "index.css")
+        os.utime(dest_path, ns=(0, 0))
+        counts = copy_directory_recursive(self.source_dir, self.dest_dir)
+        self.assertEqual(counts, {"copied": 0, "unchanged": 2, "removed": 0})
+        self.assertEqual(os.stat(dest_path).st_mtime_ns, 0)
+
+    def test_kept_files_survive(self):
+        os.makedirs(self.dest_dir)
+        self._write(os.path.join(self.dest_dir, "page.html"), "page")
+        copy_directory_recursive(self.source_dir, self.dest_dir, keep=lambda path: path.endswith(".html"))
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "page.html")), "page")
+
+
+class TestSyncDirectory(CopyStaticTestCase):
+    def test_initial_sync_copies_everything(self):
+        counts = self._sync()
+        self.assertEqual(counts, {"copied": 2, "unchanged": 0, "removed": 0})
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "index.css")), "body {}")
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "images", "tom.png")), "png")
+
+    def test_second_sync_copies_nothing(self):
+        self._sync()
+        counts = self._sync()
+        self.assertEqual(counts, {"copied": 0, "unchanged": 2, "removed": 0})
+
+    def test_changed_file_is_copied(self):
+        self._sync()
+        self._write(os.path.join(self.source_dir, "index.css"), "body { color: red; }")
+        counts = self._sync()
+        self.assertEqual(counts["copied"], 1)
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "index.css")), "body { color: red; }")
+
+    def test_checksum_detects_same_size_change(self):
+        self._sync()
+        dest_path = os.path.join(self.dest_dir, "index.css")
+        self._write(dest_path, "body []")
+        stat = os.stat(os.path.join(self.source_dir, "index.css"))
+        os.utime(dest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self.assertEqual(self._sync()["copied"], 0)
+        self.assertEqual(self._sync(checksum=True)["copied"], 1)
+        self.assertEqual(self._read(dest_path), "body {}")
+
+    def test_touched_source_is_not_copied(self):
+        self._sync()
+        source_path = os.path.join(self.source_dir, "index.css")
+        os.utime(source_path, ns=(0, 0))
+        self.assertEqual(self._sync()["copied"], 0)
+
+    def test_touched_source_is_hashed_once(self):
+        self._sync()
+        os.utime(os.path.join(self.source_dir, "index.css"), ns=(0, 0))
+        outputs = OutputRecorder(self.dest_dir)
+        self._sync(outputs=outputs)
+        # The next sync trusts the recorded match instead of hashing again
+        outputs = OutputRecorder(self.dest_dir, outputs.files)
+        with mock.patch("copy_static.file_digest") as file_digest:
+            self.assertEqual(self._sync(outputs=outputs)["copied"], 0)
+        file_digest.assert_not_called()
+        # Until the source changes again
+        self._write(os.path.join(self.source_dir, "index.css"), "body {!}")
+        os.utime(os.path.join(self.source_dir, "index.css"), ns=(0, 0))
+        self.assertEqual(self._sync(outputs=OutputRecorder(self.dest_dir, outputs.files))["copied"], 1)
+
+    def test_outputs_are_recorded(self):
+        self._sync()
+        self._write(os.path.join(self.source_dir, "index.css"), "body { margin: 0 }")
+        outputs = OutputRecorder(self.dest_dir)
+        self._sync(outputs=outputs)
+        self.assertEqual(set(outputs.files), {"index.css", "images/tom.png"})
+        self.assertEqual(
+            outputs.files["index.css"]["sha256"], hashlib.sha256(b"body { margin: 0 }").hexdigest()
+        )
+
+    def test_fingerprinted_copies(self):
+        self._write(os.path.join(self.source_dir, "page.html"), "<p>page</p>")
+        asset_map = {}
+        self._sync(asset_map=asset_map)
+        digest = hashlib.sha256(b"body {}").hexdigest()
+        self.assertEqual(asset_map["/index.css"], f"/index.{digest[:10]}.css")
+        self.assertEqual(set(asset_map), {"/index.css", "/images/tom.png"})
+        self.assertEqual(self._read(os.path.join(self.dest_dir, f"index.{digest[:10]}.css")), "body {}")
+        # Originals stay in place for references that are not rewritten
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "index.css")), "body {}")
+
+    def test_fingerprinted_copies_are_links(self):
+        asset_map = {}
+        self._sync(asset_map=asset_map)
+        fingerprinted = os.stat(os.path.join(self.dest_dir, asset_map["/index.css"][1:]))
+        self.assertEqual(fingerprinted.st_ino, os.stat(os.path.join(self.dest_dir, "index.css")).st_ino)
+        # Replacing the synced copy leaves the fingerprinted name as it was
+        self._write(os.path.join(self.source_dir, "index.css"), "body { margin: 0 }")
+        self._sync(asset_map={}, keep=lambda path: path.startswith("index."))
+        self.assertEqual(self._read(os.path.join(self.dest_dir, asset_map["/index.css"][1:])), "body {}")
+
+    def test_unlinked_files_are_not_fingerprinted(self):
+        for name in ("CNAME", ".htaccess", "robots.txt"):
+            self._write(os.path.join(self.source_dir, name), name)
+        asset_map = {}
+        self._sync(asset_map=asset_map)
+        self.assertEqual(set(asset_map), {"/index.css", "/images/tom.png", "/robots.txt"})
+        self.assertEqual(
+            sorted(name for name in os.listdir(self.dest_dir) if name.startswith(("CNAME", ".htaccess"))),
+            [".htaccess", "CNAME"],
+        )
+
+    def test_fingerprints_reuse_recorded_hashes(self):
+        first = {}
+        outputs = OutputRecorder(self.dest_dir)
+        self._sync(asset_map=first, outputs=outputs)
+        second = {}
+        with mock.patch("copy_static.file_digest") as file_digest:
+            self._sync(asset_map=second, outputs=OutputRecorder(self.dest_dir, outputs.files))
+        file_digest.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_old_fingerprints_are_removed(self):
+        first = {}
+        self._sync(asset_map=first)
+        self._write(os.path.join(self.source_dir, "index.css"), "body { margin: 0 }")
+        second = {}
+        counts = self._sync(asset_map=second)
+        self.assertEqual(counts, {"copied": 2, "unchanged": 2, "removed": 1})
+        self.assertNotEqual(first["/index.css"], second["/index.css"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, first["/index.css"][1:])))
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, second["/index.css"][1:])))
+
+    def test_stale_files_are_removed(self):
+        self._sync()
+        shutil.rmtree(os.path.join(self.source_dir, "images"))
+        counts = self._sync()
+        self.assertEqual(counts["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.dest_dir, "images")))
+
+    def test_kept_files_are_left_alone(self):
+        self._sync()
+        page_path = os.path.join(self.dest_dir, "blog", "index.html")
+        os.makedirs(os.path.dirname(page_path))
+        self._write(page_path, "<p>page</p>")
+        counts = self._sync(keep=lambda path: path.endswith(".html"))
+        self.assertEqual(counts["removed"], 0)
+        self.assertEqual(self._read(page_path), "<p>page</p>")
+
+    def test_empty_source_directory_is_kept(self):
+        os.makedirs(os.path.join(self.source_dir, "empty"))
+        self._sync()
+        self.assertTrue(os.path.isdir(os.path.join(self.dest_dir, "empty")))
+
+
+class TestCopyFile(CopyStaticTestCase):
+    def setUp(self):
+        super().setUp()
+        os.makedirs(self.dest_dir)
+        self.source_path = os.path.join(self.source_dir, "index.css")
+        self.dest_path = os.path.join(self.dest_dir, "index.css")
+
+    def test_copy_preserves_content_and_mtime(self):
+        self.assertEqual(copy_file(self.source_path, self.dest_path), "copy")
+        self.assertEqual(self._read(self.dest_path), "body {}")
+        self.assertEqual(os.stat(self.dest_path).st_mtime_ns, os.stat(self.source_path).st_mtime_ns)
+        self.assertFalse(os.path.samefile(self.source_path, self.dest_path))
+
+    def test_hardlink(self):
+        self.assertEqual(copy_file(self.source_path, self.dest_path, "hardlink"), "hardlink")
+        self.assertTrue(os.path.samefile(self.source_path, self.dest_path))
+
+    def test_fast_paths_fall_back_to_copy(self):
+        for mode in ("reflink", "auto"):
+            method = copy_file(self.source_path, self.dest_path, mode)
+            self.assertIn(method, ("reflink", "copy_file_range", "copy"))
+            self.assertEqual(self._read(self.dest_path), "body {}")
+            self.assertEqual(os.stat(self.dest_path).st_mtime_ns, os.stat(self.source_path).st_mtime_ns)
+
+    @unittest.skipUnless(hasattr(os, "copy_file_range"), "copy_file_range is not available")
+    def test_short_copy_file_range_falls_back_to_copy(self):
+        # A filesystem that stops copying early must not leave a truncated file
+        with mock.patch("copy_static._reflink", side_effect=OSError(errno.EOPNOTSUPP, "no reflink")), \
+                mock.patch("os.copy_file_range", return_value=0):
+            method = copy_file(self.source_path, self.dest_path, "auto")
+        self.assertEqual(method, "copy")
+        self.assertEqual(self._read(self.dest_path), "body {}")
+
+    def test_replaces_existing_hardlink(self):
+        copy_file(self.source_path, self.dest_path, "hardlink")
+        copy_file(self.source_path, self.dest_path, "copy")
+        self.assertFalse(os.path.samefile(self.source_path, self.dest_path))
+        self.assertEqual(self._read(self.dest_path), "body {}")
+
+    def test_no_temporary_files_are_left(self):
+        for mode in ("copy", "hardlink", "auto"):
+            copy_file(self.source_path, self.dest_path, mode)
+        self.assertEqual(os.listdir(self.dest_dir), ["index.css"])
+
+    def test_invalid_mode_raises_error(self):
+        with self.assertRaises(ValueError):
+            copy_file(self.source_path, self.dest_path, "teleport")
+
+    def test_sync_with_hardlinks(self):
+        shutil.rmtree(self.dest_dir)
+        self._sync(copy_mode="hardlink")
+        counts = self._sync(copy_mode="hardlink")
+        self.assertEqual(counts["copied"], 0)
+        self.assertTrue(os.path.samefile(self.source_path, self.dest_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+
+from dev_server import InotifyWatcher, PollingWatcher, SiteRebuilder, make_server
+
+
+class DevServerTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.tmp_dir, "content")
+        self.static_dir = os.path.join(self.tmp_dir, "static")
+        self.docs_dir = os.path.join(self.tmp_dir, "docs")
+        self.template_path = os.path.join(self.tmp_dir, "template.html")
+        for directory in (self.content_dir, self.static_dir, self.docs_dir):
+            os.makedirs(directory)
+        self._write(self.template_path, "<title>{{ Title }}</title>{{ Content }}")
+        self._write(os.path.join(self.content_dir, "index.md"), "# Home")
+        self._write(os.path.join(self.static_dir, "index.css"), "body {}")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def _read(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+
+class TestSiteRebuilder(DevServerTestCase):
+    def setUp(self):
+        super().setUp()
+        self.rebuilder = SiteRebuilder(
+            self.content_dir, self.static_dir, self.template_path, self.docs_dir,
+            manifest_path=os.path.join(self.tmp_dir, "manifest.json"),
+        )
+
+    def _rebuild(self, *paths):
+        return self.rebuilder.rebuild(set(paths))
+
+    def test_changed_page_is_generated(self):
+        markdown_path = os.path.join(self.content_dir, "index.md")
+        updated = self._rebuild(markdown_path)
+        dest_path = os.path.join(self.docs_dir, "index.html")
+        self.assertEqual(updated, [dest_path])
+        self.assertEqual(self._read(dest_path), "<title>Home</title><div><h1>Home</h1></div>")
+
+    def test_deleted_page_is_removed(self):
+        markdown_path = os.path.join(self.content_dir, "index.md")
+        self._rebuild(markdown_path)
+        os.remove(markdown_path)
+        self._rebuild(markdown_path)
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, "index.html")))
+
+    def test_changed_asset_is_copied_alone(self):
+        other_path = os.path.join(self.static_dir, "other.css")
+        self._write(other_path, "p {}")
+        updated = self._rebuild(os.path.join(self.static_dir, "index.css"))
+        self.assertEqual(updated, [os.path.join(self.docs_dir, "index.css")])
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, "other.css")))
+
+    def test_deleted_asset_is_removed(self):
+        asset_path = os.path.join(self.static_dir, "index.css")
+        self._rebuild(asset_path)
+        os.remove(asset_path)
+        self._rebuild(asset_path)
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, "index.css")))
+
+    def test_template_change_rebuilds_pages(self):
+        self._write(os.path.join(self.content_dir, "about.md"), "# About")
+        self._rebuild(self.template_path)
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, "about.html")))
+
+    def test_page_deleted_with_template_change_is_removed(self):
+        about_path = os.path.join(self.content_dir, "about.md")
+        self._write(about_path, "# About")
+        self._rebuild(self.template_path)
+        os.remove(about_path)
+        self._write(self.template_path, "<h1>{{ Title }}</h1>{{ Content }}")
+        self._rebuild(self.template_path, about_path)
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, "about.html")))
+        self.assertTrue(self._read(os.path.join(self.docs_dir, "index.html")).startswith("<h1>Home</h1>"))
+
+    def test_reported_roots_rebuild_everything(self):
+        # What the inotify watcher reports after a queue overflow
+        self._write(os.path.join(self.static_dir, "page.html"), "<p>static page</p>")
+        self._write(os.path.join(self.content_dir, "b.md"), "# B")
+        roots = (self.content_dir, self.static_dir, self.template_path)
+        self._rebuild(*roots)
+        self._write(os.path.join(self.static_dir, "index.css"), "body { margin: 0 }")
+        os.remove(os.path.join(self.content_dir, "b.md"))
+        self._rebuild(*roots)
+        self.assertEqual(self._read(os.path.join(self.docs_dir, "index.css")), "body { margin: 0 }")
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, "b.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs_dir, "page.html")))
+
+    def test_reported_content_root_removes_deleted_pages(self):
+        markdown_path = os.path.join(self.content_dir, "index.md")
+        self._rebuild(markdown_path)
+        os.remove(markdown_path)
+        self._rebuild(self.content_dir)
+        self.assertFalse(os.path.exists(os.path.join(self.docs_dir, "index.html")))
+
+
+class WatcherTests:
+    def create_watcher(self, paths):
+        raise NotImplementedError
+
+    def test_detects_modified_file(self):
+        watcher = self.create_watcher([self.content_dir, self.template_path])
+        try:
+            markdown_path = os.path.join(self.content_dir, "index.md")
+            self._write(markdown_path, "# Changed title")
+            self.assertIn(markdown_path, watcher.wait(5))
+        finally:
+            watcher.close()
+
+    def test_detects_file_in_new_directory(self):
+        watcher = self.create_watcher([self.content_dir])
+        try:
+            os.makedirs(os.path.join(self.content_dir, "blog"))
+            markdown_path = os.path.join(self.content_dir, "blog", "post.md")
+            self._write(markdown_path, "# Post")
+            changed = set()
+            deadline = time.monotonic() + 5
+            while markdown_path not in changed and time.monotonic() < deadline:
+                changed |= watcher.wait(1)
+            self.assertIn(markdown_path, changed)
+        finally:
+            watcher.close()
+
+    def test_ignores_unwatched_files(self):
+        watcher = self.create_watcher([self.template_path])
+        try:
+            self._write(os.path.join(self.tmp_dir, "notes.txt"), "unrelated")
+            self.assertEqual(watcher.wait(0.3), set())
+        finally:
+            watcher.close()
+
+
+class TestPollingWatcher(WatcherTests, DevServerTestCase):
+    def create_watcher(self, paths):
+        return PollingWatcher(paths, interval=0.05)
+
+
+class TestInotifyWatcher(WatcherTests, DevServerTestCase):
+    def create_watcher(self, paths):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError, TypeError):
+            self.skipTest("inotify is not available")
+
+
+class TestServer(DevServerTestCase):
+    def test_serves_docs(self):
+        self._write(os.path.join(self.docs_dir, "index.html"), "<p>served</p>")
+        server = make_server(self.docs_dir, "127.0.0.1", 0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_address[1]}/index.html"
+            with urllib.request.urlopen(url) as response:
+                self.assertEqual(response.read(), b"<p>served</p>")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
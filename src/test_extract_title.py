@@ -96,6 +96,12 @@ More content"""
         result = extract_title(markdown)
         self.assertEqual(result, "This is **bold** and _italic_ title")
 
+    def test_extract_title_from_lines(self):
+        lines = iter(["Intro\n", "# The Title\n", "More text\n"])
+        self.assertEqual(extract_title(lines), "The Title")
+        # Reading stops right after the title line
+        self.assertEqual(next(lines), "More text\n")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,315 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import generate_page as generate_page_module
+from change_manifest import OutputRecorder
+from copy_static import AssetMap
+from generate_page import generate_page, generate_pages_recursive, load_manifest
+from profiler import BuildProfiler
+
+
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+
+class TestGeneratePagesRecursive(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.content_dir = os.path.join(self.tmp_dir, "content")
+        self.dest_dir = os.path.join(self.tmp_dir, "docs")
+        self.template_path = os.path.join(self.tmp_dir, "template.html")
+        self.manifest_path = os.path.join(self.tmp_dir, "manifest.json")
+        os.makedirs(os.path.join(self.content_dir, "blog"))
+        self._write(self.template_path, TEMPLATE)
+        self._write(os.path.join(self.content_dir, "index.md"), "# Home\n\nWelcome")
+        self._write(os.path.join(self.content_dir, "blog", "post.md"), "# Post\n\nA **post**")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def _read(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _build(self, basepath="/", jobs=1, pipeline=False):
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.dest_dir, basepath, self.manifest_path, jobs,
+            pipeline=pipeline,
+        )
+
+    def test_generates_all_pages(self):
+        self._build()
+        self.assertEqual(
+            self._read(os.path.join(self.dest_dir, "blog", "post.html")),
+            "<title>Post</title><body><div><h1>Post</h1><p>A <b>post</b></p></div></body>",
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "index.html")))
+
+    def test_manifest_records_pages(self):
+        self._build()
+        manifest = load_manifest(self.manifest_path)
+        self.assertEqual(sorted(manifest), [os.path.join("blog", "post.html"), "index.html"])
+        self.assertEqual(manifest["index.html"]["source"], "index.md")
+        self.assertEqual(manifest["index.html"]["basepath"], "/")
+
+    def test_unchanged_pages_are_skipped(self):
+        self._build()
+        dest_path = os.path.join(self.dest_dir, "index.html")
+        self._write(dest_path, "sentinel")
+        self._build()
+        self.assertEqual(self._read(dest_path), "sentinel")
+
+    def test_changed_content_is_rebuilt(self):
+        self._build()
+        post_path = os.path.join(self.dest_dir, "blog", "post.html")
+        index_path = os.path.join(self.dest_dir, "index.html")
+        self._write(index_path, "sentinel")
+        self._write(os.path.join(self.content_dir, "blog", "post.md"), "# Post\n\nEdited and longer")
+        self._build()
+        self.assertIn("Edited and longer", self._read(post_path))
+        self.assertEqual(self._read(index_path), "sentinel")
+
+    def test_changed_template_rebuilds_everything(self):
+        self._build()
+        self._write(self.template_path, "<h>{{ Title }}</h>{{ Content }}")
+        self._build()
+        self.assertTrue(self._read(os.path.join(self.dest_dir, "index.html")).startswith("<h>Home</h>"))
+
+    def test_changed_basepath_rebuilds_everything(self):
+        self._build()
+        dest_path = os.path.join(self.dest_dir, "index.html")
+        self._write(dest_path, "sentinel")
+        self._build("/site/")
+        self.assertNotEqual(self._read(dest_path), "sentinel")
+
+    def test_missing_output_is_rebuilt(self):
+        self._build()
+        dest_path = os.path.join(self.dest_dir, "index.html")
+        os.remove(dest_path)
+        self._build()
+        self.assertTrue(os.path.exists(dest_path))
+
+    def test_corrupt_manifest_rebuilds(self):
+        self._build()
+        self._write(self.manifest_path, "not json")
+        dest_path = os.path.join(self.dest_dir, "index.html")
+        self._write(dest_path, "sentinel")
+        self._build()
+        self.assertNotEqual(self._read(dest_path), "sentinel")
+
+    def test_parallel_matches_serial(self):
+        self._build()
+        serial = self._read(os.path.join(self.dest_dir, "blog", "post.html"))
+        shutil.rmtree(self.dest_dir)
+        os.remove(self.manifest_path)
+        self._build(jobs=2)
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "blog", "post.html")), serial)
+
+    def test_identical_output_is_not_rewritten(self):
+        dest_path = os.path.join(self.dest_dir, "index.html")
+        for pipeline in (False, True):
+            self._build()
+            os.utime(dest_path, ns=(0, 0))
+            os.remove(self.manifest_path)
+            counts = generate_pages_recursive(
+                self.content_dir, self.template_path, self.dest_dir, "/", self.manifest_path, pipeline=pipeline
+            )
+            self.assertEqual(counts, {"changed": 0, "unchanged": 2})
+            self.assertEqual(os.stat(dest_path).st_mtime_ns, 0)
+
+    def test_changed_output_counts(self):
+        self._build()
+        self._write(os.path.join(self.content_dir, "index.md"), "# Home\n\nWelcome back")
+        counts = generate_pages_recursive(
+            self.content_dir, self.template_path, self.dest_dir, "/", self.manifest_path, 2
+        )
+        self.assertEqual(counts, {"changed": 1, "unchanged": 0})
+        self.assertIn("Welcome back", self._read(os.path.join(self.dest_dir, "index.html")))
+
+    def test_outputs_are_recorded(self):
+        expected = None
+        for jobs, pipeline in ((1, False), (2, False), (1, True)):
+            outputs = OutputRecorder(self.dest_dir)
+            generate_pages_recursive(
+                self.content_dir, self.template_path, self.dest_dir, "/", self.manifest_path, jobs,
+                pipeline=pipeline, outputs=outputs,
+            )
+            hashes = {path: entry["sha256"] for path, entry in outputs.files.items()}
+            self.assertEqual(set(hashes), {"index.html", "blog/post.html"})
+            if expected is not None:
+                self.assertEqual(hashes, expected)
+            expected = hashes
+            os.remove(self.manifest_path)
+
+    def test_skipped_pages_are_recorded(self):
+        self._build()
+        outputs = OutputRecorder(self.dest_dir)
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.dest_dir, "/", self.manifest_path, outputs=outputs
+        )
+        self.assertEqual(set(outputs.files), {"index.html", "blog/post.html"})
+
+    def test_asset_urls_are_rewritten(self):
+        self._write(self.template_path, '<link href="/index.css">' + TEMPLATE)
+        self._write(
+            os.path.join(self.content_dir, "index.md"),
+            '# Home\n\n![tom](/images/tom.png)\n\n```\n<img src="/images/tom.png">\n```',
+        )
+        asset_map = AssetMap({"/index.css": "/index.0123456789.css", "/images/tom.png": "/images/tom.abcdef0123.png"})
+        for jobs, pipeline in ((1, False), (2, False), (1, True)):
+            generate_pages_recursive(
+                self.content_dir, self.template_path, self.dest_dir, "/site/", jobs=jobs, pipeline=pipeline,
+                asset_map=asset_map,
+            )
+            html = self._read(os.path.join(self.dest_dir, "index.html"))
+            self.assertIn('href="/site/index.0123456789.css"', html)
+            self.assertIn('src="/site/images/tom.abcdef0123.png"', html)
+            # Code samples are left as written
+            self.assertIn('<code><img src="/images/tom.png">', html)
+
+    def test_changed_asset_map_rebuilds_everything(self):
+        self._build()
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.dest_dir, "/", self.manifest_path,
+            asset_map=AssetMap({"/index.css": "/index.0123456789.css"}),
+        )
+        self.assertEqual(len(load_manifest(self.manifest_path)), 2)
+        with self.assertLogs("statichtml", "INFO") as logs:
+            self._build()
+        self.assertIn("skipped 0 up to date", logs.output[-1])
+
+    def test_pipelined_matches_serial(self):
+        self._build()
+        serial = self._read(os.path.join(self.dest_dir, "blog", "post.html"))
+        shutil.rmtree(self.dest_dir)
+        os.remove(self.manifest_path)
+        self._build(pipeline=True)
+        self.assertEqual(self._read(os.path.join(self.dest_dir, "blog", "post.html")), serial)
+        self.assertIn("index.html", load_manifest(self.manifest_path))
+
+    def test_pipelined_streams_large_files(self):
+        original = generate_page_module.CONTENT_SPOOL_BYTES
+        generate_page_module.CONTENT_SPOOL_BYTES = 10
+        try:
+            self._build(pipeline=True)
+        finally:
+            generate_page_module.CONTENT_SPOOL_BYTES = original
+        self.assertEqual(
+            self._read(os.path.join(self.dest_dir, "blog", "post.html")),
+            "<title>Post</title><body><div><h1>Post</h1><p>A <b>post</b></p></div></body>",
+        )
+
+    def test_pipelined_counts_large_files(self):
+        self._write(os.path.join(self.content_dir, "short.md"), "# S")
+        original = generate_page_module.CONTENT_SPOOL_BYTES
+        generate_page_module.CONTENT_SPOOL_BYTES = 10
+        try:
+            counts = generate_pages_recursive(
+                self.content_dir, self.template_path, self.dest_dir, "/", pipeline=True
+            )
+        finally:
+            generate_page_module.CONTENT_SPOOL_BYTES = original
+        self.assertEqual(counts, {"changed": 3, "unchanged": 0})
+
+    def test_pipelined_pages_are_profiled(self):
+        profiler = BuildProfiler()
+        generate_pages_recursive(
+            self.content_dir, self.template_path, self.dest_dir, "/", profiler=profiler, pipeline=True
+        )
+        self.assertEqual(len(profiler.pages), 2)
+        for record in profiler.pages:
+            self.assertIn("read", record["phases"])
+            self.assertIn("write", record["phases"])
+        self.assertIn("read", profiler.phase_totals)
+        self.assertIn("write", profiler.phase_totals)
+
+    def test_pipelined_failures_are_collected_in_order(self):
+        self._write(os.path.join(self.content_dir, "blog", "broken.md"), "No title here")
+        self._write(os.path.join(self.content_dir, "broken.md"), "Still no title")
+        # A directory where a page should go makes the writer stage fail
+        os.makedirs(os.path.join(self.dest_dir, "index.html"))
+        with self.assertLogs("statichtml", "ERROR") as logs:
+            with self.assertRaises(RuntimeError) as context:
+                self._build(pipeline=True)
+        self.assertIn("3 page(s)", str(context.exception))
+        self.assertEqual(
+            [line.split(": ")[0].rsplit(" ", 1)[1] for line in logs.output],
+            [
+                os.path.join(self.content_dir, "broken.md"),
+                os.path.join(self.content_dir, "index.md"),
+                os.path.join(self.content_dir, "blog", "broken.md"),
+            ],
+        )
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "blog", "post.html")))
+
+    def test_failures_are_collected(self):
+        self._write(os.path.join(self.content_dir, "blog", "broken.md"), "No title here")
+        self._write(os.path.join(self.content_dir, "broken.md"), "Still no title")
+        with self.assertLogs("statichtml", "ERROR") as logs:
+            with self.assertRaises(RuntimeError) as context:
+                generate_pages_recursive(
+                    self.content_dir, self.template_path, self.dest_dir, "/", self.manifest_path, 2
+                )
+        self.assertIn("2 page(s)", str(context.exception))
+        self.assertEqual(len(logs.output), 2)
+        self.assertIn(os.path.join("blog", "broken.md"), logs.output[1])
+        # The good pages are still generated and recorded
+        self.assertTrue(os.path.exists(os.path.join(self.dest_dir, "index.html")))
+        manifest = load_manifest(self.manifest_path)
+        self.assertIn("index.html", manifest)
+        self.assertNotIn("broken.html", manifest)
+
+
+class TestGeneratePage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.tmp_dir, "template.html")
+        with open(self.template_path, "w", encoding="utf-8") as f:
+            f.write(TEMPLATE)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _generate(self, markdown):
+        source_path = os.path.join(self.tmp_dir, "page.md")
+        dest_path = os.path.join(self.tmp_dir, "out", "page.html")
+        with open(source_path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+        metadata = generate_page(source_path, self.template_path, dest_path)
+        return metadata, dest_path
+
+    def test_returns_metadata(self):
+        metadata, dest_path = self._generate("# Page\n\n## Intro\n\nThree short words")
+        self.assertEqual(metadata.title, "Page")
+        self.assertEqual(metadata.outline, [(1, "Page"), (2, "Intro")])
+        self.assertEqual(metadata.word_count, 5)
+        with open(dest_path, "r", encoding="utf-8") as f:
+            self.assertEqual(
+                f.read(),
+                "<title>Page</title><body><div><h1>Page</h1><h2>Intro</h2><p>Three short words</p></div></body>",
+            )
+
+    def test_title_after_large_content(self):
+        # Content beyond the in-memory buffer spills to disk intact
+        paragraphs = "\n\n".join(f"Paragraph {i} " + "word " * 50 for i in range(20000))
+        metadata, dest_path = self._generate(paragraphs + "\n\n# Late title")
+        self.assertEqual(metadata.title, "Late title")
+        with open(dest_path, "r", encoding="utf-8") as f:
+            html = f.read()
+        self.assertTrue(html.startswith("<title>Late title</title><body><div><p>Paragraph 0 "))
+        self.assertTrue(html.endswith("<h1>Late title</h1></div></body>"))
+        self.assertEqual(html.count("<p>"), 20000)
+
+    def test_missing_title_writes_nothing(self):
+        with self.assertRaises(ValueError):
+            self._generate("No title here")
+        self.assertFalse(os.path.exists(os.path.join(self.tmp_dir, "out", "page.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
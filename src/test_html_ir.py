@@ -0,0 +1,136 @@
+import unittest
+from io import StringIO
+
+from html_ir import HTMLDocument, OPEN, TEXT, CLOSE
+from htmlnode import LeafNode, ParentNode
+from markdown_blocks import markdown_to_document, markdown_to_html_node
+
+
+class TestHTMLDocument(unittest.TestCase):
+    def test_empty(self):
+        document = HTMLDocument()
+        self.assertEqual(document.to_html(), "")
+        self.assertEqual(len(document), 0)
+
+    def test_leaf(self):
+        document = HTMLDocument()
+        document.leaf("a", "Click me!", {"href": "https://www.google.com"})
+        self.assertEqual(document.to_html(), '<a href="https://www.google.com">Click me!</a>')
+
+    def test_leaf_no_tag(self):
+        document = HTMLDocument()
+        document.leaf(None, "Just text")
+        self.assertEqual(document.to_html(), "Just text")
+
+    def test_leaf_empty_value(self):
+        document = HTMLDocument()
+        document.leaf("img", "", {"src": "cat.jpg", "alt": "A cat"})
+        self.assertEqual(
+            document.to_html(),
+            LeafNode("img", "", {"src": "cat.jpg", "alt": "A cat"}).to_html(),
+        )
+
+    def test_leaf_no_value_raises_error(self):
+        document = HTMLDocument()
+        with self.assertRaises(ValueError):
+            document.leaf("p", None)
+
+    def test_nested(self):
+        document = HTMLDocument()
+        document.open("div", {"class": "container"})
+        document.open("p")
+        document.leaf("b", "Bold")
+        document.text(" text")
+        document.close()
+        document.close()
+        expected = ParentNode(
+            "div",
+            [ParentNode("p", [LeafNode("b", "Bold"), LeafNode(None, " text")])],
+            {"class": "container"},
+        )
+        self.assertEqual(document.to_html(), expected.to_html())
+
+    def test_flat_arrays(self):
+        document = HTMLDocument()
+        document.open("p")
+        document.leaf("b", "x")
+        document.close()
+        self.assertEqual(list(document.ops), [OPEN, OPEN, TEXT, CLOSE, CLOSE])
+        self.assertEqual(document.tags, ["p", "b"])
+        self.assertEqual(document.texts, ["x"])
+
+    def test_tags_are_interned(self):
+        document = HTMLDocument()
+        for i in range(100):
+            document.leaf("li", str(i))
+        self.assertEqual(document.tags, ["li"])
+
+    def test_clear_reuses_document(self):
+        document = HTMLDocument()
+        document.leaf("a", "first", {"href": "/x"})
+        document.open("div")
+        document.clear()
+        self.assertEqual(len(document), 0)
+        document.leaf("p", "second")
+        self.assertEqual(document.to_html(), "<p>second</p>")
+        self.assertEqual(document.attrs, [])
+
+    def test_unclosed_raises_error(self):
+        document = HTMLDocument()
+        document.open("div")
+        with self.assertRaises(ValueError):
+            document.to_html()
+
+    def test_close_without_open_raises_error(self):
+        with self.assertRaises(ValueError):
+            HTMLDocument().close()
+
+    def test_open_without_tag_raises_error(self):
+        with self.assertRaises(ValueError):
+            HTMLDocument().open(None)
+
+    def test_write_html_in_chunks(self):
+        document = HTMLDocument()
+        document.open("ul")
+        for i in range(2000):
+            document.leaf("li", str(i))
+        document.close()
+        self.assertGreater(len(list(document.iter_html())), 1)
+        out = StringIO()
+        document.write_html(out)
+        self.assertEqual(out.getvalue(), document.to_html())
+
+
+class TestMarkdownToDocument(unittest.TestCase):
+    def test_matches_tree(self):
+        md = """
+# Heading with [a link](/contact)
+
+This is **bolded** paragraph
+text with ![an image](/images/tom.png)
+
+> A quote
+> with _italic_
+
+- one
+- `two`
+
+1. first
+2. second
+
+```
+code **stays**
+```
+"""
+        for basepath in ("/", "/site/"):
+            self.assertEqual(
+                markdown_to_document(md, basepath).to_html(),
+                markdown_to_html_node(md, basepath).to_html(),
+            )
+
+    def test_empty_markdown(self):
+        self.assertEqual(markdown_to_document("").to_html(), "<div></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
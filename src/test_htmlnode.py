@@ -1,4 +1,5 @@
 import unittest
+from io import StringIO
 
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -177,6 +178,46 @@ class TestParentNode(unittest.TestCase):
         parent_node = ParentNode("div", [])
         self.assertEqual(parent_node.to_html(), "<div></div>")
 
+    def test_iter_html_yields_chunks(self):
+        node = ParentNode("p", [LeafNode("b", f"Bold {i}") for i in range(2000)])
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual("".join(chunks), node.to_html())
+        for chunk in chunks[:-1]:
+            self.assertTrue(chunk.endswith(">"))
+
+    def test_write_html_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [ParentNode("p", [LeafNode("a", "link", {"href": "/x"})]), LeafNode("span", "s")],
+            {"class": "c"},
+        )
+        out = StringIO()
+        node.write_html(out)
+        self.assertEqual(out.getvalue(), node.to_html())
+
+    def test_iter_html_no_children_raises_error(self):
+        node = ParentNode("div", None)
+        with self.assertRaises(ValueError):
+            list(node.iter_html())
+
+    def test_to_html_deeply_nested(self):
+        node = LeafNode("b", "deep")
+        for _ in range(10000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 10000 + "<b>deep</b>"))
+        self.assertTrue(html.endswith("</span>" * 10000))
+
+    def test_to_html_nested_invalid_child_raises_error(self):
+        node = ParentNode("div", [ParentNode("p", [LeafNode("b", "ok")]), ParentNode(None, [])])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
+    def test_no_instance_dict(self):
+        for node in (HTMLNode("p"), LeafNode("b", "x"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+
 
 if __name__ == "__main__":
     unittest.main()
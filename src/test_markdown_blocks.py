@@ -1,6 +1,14 @@
 import unittest
+from io import StringIO
 
-from markdown_blocks import markdown_to_blocks, block_to_block_type, BlockType
+from markdown_blocks import (
+    markdown_to_blocks,
+    block_to_block_type,
+    BlockType,
+    iter_blocks,
+    iter_markdown_html,
+    markdown_to_html_node,
+)
 
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -302,6 +310,53 @@ class TestBlockToBlockType(unittest.TestCase):
         block = "1 This starts with a number but isn't a list\n2 Same here"
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
+    def test_block_to_block_type_ordered_list_long_broken_at_end(self):
+        lines = [f"{i}. item" for i in range(1, 100)] + ["101. item"]
+        self.assertEqual(block_to_block_type("\n".join(lines)), BlockType.PARAGRAPH)
+
+    def test_block_to_block_type_quote_and_list_markers_mixed(self):
+        block = "> quote\n- item"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+
+class TestIterBlocks(unittest.TestCase):
+    def test_iter_blocks_from_file(self):
+        md = StringIO("# Heading\n\nSome paragraph\nover two lines\n\n- a\n- b\n")
+        self.assertEqual(
+            list(iter_blocks(md)),
+            [
+                (BlockType.HEADING, ["# Heading"]),
+                (BlockType.PARAGRAPH, ["Some paragraph", "over two lines"]),
+                (BlockType.UNORDERED_LIST, ["- a", "- b"]),
+            ],
+        )
+
+    def test_iter_blocks_matches_markdown_to_blocks(self):
+        samples = [
+            "",
+            "   ",
+            "a\n\n\nb",
+            "a\n\n\n\nb",
+            "  leading\n  \n  still same block  \n\n\n   trailing   \n",
+            "\n\n  \n# h\n\n```\ncode\n```\n\n\t\n",
+        ]
+        for md in samples:
+            # The original split-and-strip definition of a block
+            expected = [block.strip() for block in md.split("\n\n") if block.strip()]
+            blocks = ["\n".join(lines) for _, lines in iter_blocks(StringIO(md))]
+            self.assertEqual(blocks, expected)
+            self.assertEqual(markdown_to_blocks(md), expected)
+
+    def test_iter_markdown_html_matches_tree(self):
+        md = "# Title\n\nText with **bold**\n\n> quote\n\n1. one\n2. two\n\n```\ncode\n```\n"
+        self.assertEqual(
+            "".join(iter_markdown_html(StringIO(md), "/site/")),
+            markdown_to_html_node(md, "/site/").to_html(),
+        )
+
+    def test_iter_markdown_html_empty(self):
+        self.assertEqual("".join(iter_markdown_html(StringIO(""))), "<div></div>")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
-from markdown_blocks import markdown_to_html_node
+from extract_title import extract_title
+from markdown_blocks import DocumentMetadata, iter_markdown_html, markdown_to_html_node
 
 
 class TestMarkdownToHTML(unittest.TestCase):
@@ -176,6 +177,83 @@ This paragraph has **bold text** and _italic text_ and `code text` and even [lin
             '<div><p>This paragraph has <b>bold text</b> and <i>italic text</i> and <code>code text</code> and even <a href="https://example.com">links</a> and <img src="https://example.com/image.png" alt="images"></img>.</p></div>',
         )
 
+    def test_basepath(self):
+        md = """
+See the [contact page](/contact) and ![tom](/images/tom.png).
+
+```
+<a href="/unchanged">code</a>
+```
+"""
+
+        node = markdown_to_html_node(md, "/site/")
+        html = node.to_html()
+        self.assertEqual(
+            html,
+            '<div><p>See the <a href="/site/contact">contact page</a> and <img src="/site/images/tom.png" alt="tom"></img>.</p><pre><code><a href="/unchanged">code</a>\n</code></pre></div>',
+        )
+
+
+class TestDocumentMetadata(unittest.TestCase):
+    def test_collected_during_parse(self):
+        md = """
+# The **Title**
+
+Some intro text here.
+
+## Part one
+
+- first item
+- second item
+
+> quoted words
+
+```
+code block
+```
+
+### Part _two_
+"""
+        metadata = DocumentMetadata()
+        markdown_to_html_node(md, metadata=metadata)
+        self.assertEqual(metadata.title, "The **Title**")
+        self.assertEqual(
+            metadata.outline,
+            [(1, "The Title"), (2, "Part one"), (3, "Part two")],
+        )
+        self.assertEqual(metadata.word_count, 2 + 4 + 2 + 4 + 2 + 2 + 2)
+
+    def test_title_is_first_h1(self):
+        metadata = DocumentMetadata()
+        markdown_to_html_node("## Sub\n\n# First\n\n# Second", metadata=metadata)
+        self.assertEqual(metadata.title, "First")
+        self.assertEqual(metadata.require_title(), "First")
+
+    def test_title_matches_extract_title(self):
+        # An h1 line inside a paragraph counts, as it does for extract_title
+        for md in ["Intro line\n# Title\n\nBody", "# \n\nText\n# Title", "> quote\n# Title"]:
+            metadata = DocumentMetadata()
+            markdown_to_html_node(md, metadata=metadata)
+            self.assertEqual(metadata.title, extract_title(md))
+
+    def test_missing_title(self):
+        metadata = DocumentMetadata()
+        markdown_to_html_node("Just text\n\n## Sub", metadata=metadata)
+        self.assertIsNone(metadata.title)
+        with self.assertRaises(ValueError):
+            metadata.require_title()
+
+    def test_streaming_collects_same_metadata(self):
+        md = "# Title\n\nSome words\n\n## Sub"
+        streamed = DocumentMetadata()
+        "".join(iter_markdown_html(md.split("\n"), "/", streamed))
+        parsed = DocumentMetadata()
+        markdown_to_html_node(md, metadata=parsed)
+        self.assertEqual(
+            (streamed.title, streamed.outline, streamed.word_count),
+            (parsed.title, parsed.outline, parsed.word_count),
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
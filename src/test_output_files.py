@@ -0,0 +1,82 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from output_files import AtomicWriter, file_digest, write_if_changed
+
+
+class TestAtomicWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "out", "page.html")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _read(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def test_new_file_is_written(self):
+        self.assertTrue(write_if_changed(self.path, "<p>hi</p>"))
+        self.assertEqual(self._read(), "<p>hi</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_same_content_keeps_file(self):
+        write_if_changed(self.path, "<p>hi</p>")
+        os.utime(self.path, ns=(0, 0))
+        inode = os.stat(self.path).st_ino
+        self.assertFalse(write_if_changed(self.path, "<p>hi</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 0)
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_changed_content_replaces_file(self):
+        write_if_changed(self.path, "<p>hi</p>")
+        self.assertTrue(write_if_changed(self.path, "<p>ho</p>"))
+        self.assertEqual(self._read(), "<p>ho</p>")
+
+    def test_chunks_and_encoding(self):
+        with AtomicWriter(self.path) as writer:
+            writer.write("caf")
+            writer.write("é")
+        self.assertTrue(writer.changed)
+        with open(self.path, "rb") as f:
+            self.assertEqual(f.read(), "café".encode("utf-8"))
+
+    def test_error_leaves_target_untouched(self):
+        write_if_changed(self.path, "<p>hi</p>")
+        with self.assertRaises(ValueError):
+            with AtomicWriter(self.path) as writer:
+                writer.write("<p>half")
+                raise ValueError("render failed")
+        self.assertEqual(self._read(), "<p>hi</p>")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["page.html"])
+
+    def test_hard_link_is_not_written_through(self):
+        other = os.path.join(self.tmp_dir, "other.html")
+        write_if_changed(self.path, "<p>hi</p>")
+        os.link(self.path, other)
+        write_if_changed(self.path, "<p>ho</p>")
+        with open(other, "r", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>hi</p>")
+
+    def test_permissions_follow_umask(self):
+        umask = os.umask(0o022)
+        try:
+            write_if_changed(self.path, "<p>hi</p>")
+        finally:
+            os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+    def test_file_digest(self):
+        write_if_changed(self.path, "abc")
+        self.assertEqual(
+            file_digest(self.path), "ba7816bf8f01cfea414140de5dae2223b00361a396177a9cb410ff61f20015ad"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
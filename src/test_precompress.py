@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+import precompress
+from change_manifest import OutputRecorder
+from precompress import is_compressible, precompress_file, precompress_files
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, "index.html")
+        self._write(self.path, "<p>hello</p>" * 100)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _write(self, path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_gzip_sibling(self):
+        siblings = precompress_file(self.path)
+        self.assertEqual(siblings[0][0], self.path + ".gz")
+        with open(self.path + ".gz", "rb") as f:
+            data = f.read()
+        self.assertEqual(gzip.decompress(data), ("<p>hello</p>" * 100).encode("utf-8"))
+        self.assertEqual(siblings[0][1], hashlib.sha256(data).hexdigest())
+        self.assertEqual(os.stat(self.path + ".gz").st_mtime_ns, os.stat(self.path).st_mtime_ns)
+
+    def test_output_is_deterministic(self):
+        precompress_file(self.path)
+        with open(self.path + ".gz", "rb") as f:
+            first = f.read()
+        os.remove(self.path + ".gz")
+        precompress_file(self.path)
+        with open(self.path + ".gz", "rb") as f:
+            self.assertEqual(f.read(), first)
+
+    def test_current_sibling_is_skipped(self):
+        precompress_file(self.path)
+        self.assertEqual(precompress_file(self.path)[0], (self.path + ".gz", None))
+
+    def test_rewritten_source_is_compressed_again(self):
+        precompress_file(self.path)
+        self._write(self.path, "<p>changed</p>")
+        os.utime(self.path, ns=(0, 0))
+        precompress_file(self.path)
+        with gzip.open(self.path + ".gz", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>changed</p>")
+
+    @unittest.skipIf(precompress.brotli is None, "brotli is not installed")
+    def test_brotli_sibling(self):
+        precompress_file(self.path)
+        with open(self.path + ".br", "rb") as f:
+            self.assertEqual(precompress.brotli.decompress(f.read()), ("<p>hello</p>" * 100).encode("utf-8"))
+
+    def test_changed_source_with_same_mtime_is_compressed_again(self):
+        outputs = OutputRecorder(self.tmp_dir)
+        outputs.record(self.path)
+        precompress_files([self.path], outputs=outputs)
+        # Same size and mtime, different content, as a --checksum recopy leaves it
+        stat = os.stat(self.path)
+        self._write(self.path, "<p>HELLO</p>" * 100)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        outputs = OutputRecorder(self.tmp_dir, outputs.files)
+        outputs.record(self.path, hashlib.sha256(("<p>HELLO</p>" * 100).encode("utf-8")).hexdigest())
+        counts = precompress_files([self.path], outputs=outputs)
+        self.assertEqual(counts["unchanged"], 0)
+        with gzip.open(self.path + ".gz", "rt", encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>HELLO</p>" * 100)
+        # Unchanged on the next build
+        outputs = OutputRecorder(self.tmp_dir, outputs.files)
+        outputs.record(self.path)
+        self.assertEqual(precompress_files([self.path], outputs=outputs)["compressed"], 0)
+
+    def test_precompress_files(self):
+        paths = [self.path]
+        for i in range(10):
+            paths.append(os.path.join(self.tmp_dir, f"page{i}.css"))
+            self._write(paths[-1], f"body {{ margin: {i} }}")
+        outputs = OutputRecorder(self.tmp_dir)
+        siblings = len(precompress.compressors())
+        self.assertEqual(precompress_files(paths, 4, outputs), {"compressed": 11 * siblings, "unchanged": 0})
+        self.assertEqual(len(outputs.files), 11 * siblings)
+        self.assertIn("index.html.gz", outputs.files)
+        self.assertEqual(precompress_files(paths, 4), {"compressed": 0, "unchanged": 11 * siblings})
+
+    def test_is_compressible(self):
+        self.assertTrue(is_compressible("blog/index.html"))
+        self.assertTrue(is_compressible("index.css"))
+        self.assertFalse(is_compressible("images/tom.png"))
+        self.assertFalse(is_compressible("index.html.gz"))
+
+
+if __name__ == "__main__":
+    unittest.main()
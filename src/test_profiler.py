@@ -0,0 +1,126 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from generate_page import generate_pages_recursive
+from markdown_blocks import iter_markdown_html, markdown_to_html_node
+from profiler import BuildProfiler
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_nested_phases_are_exclusive(self):
+        profiler = BuildProfiler()
+        with profiler.phase("outer"):
+            time.sleep(0.01)
+            with profiler.phase("inner"):
+                time.sleep(0.02)
+        totals = profiler.phase_totals
+        self.assertGreaterEqual(totals["inner"], 0.02)
+        self.assertGreaterEqual(totals["outer"], 0.01)
+        # Only the outermost phase becomes a build-level span
+        self.assertEqual([name for name, _, _ in profiler.spans], ["outer"])
+
+    def test_timed_iter_yields_everything(self):
+        profiler = BuildProfiler()
+        self.assertEqual(list(profiler.timed_iter("step", range(3))), [0, 1, 2])
+        self.assertIn("step", profiler.phase_totals)
+        self.assertEqual(profiler._stack, [])
+
+    def test_read_lines(self):
+        profiler = BuildProfiler()
+        lines = list(profiler.read_lines(io.StringIO("a\nb\nc"), size_hint=1))
+        self.assertEqual(lines, ["a\n", "b\n", "c"])
+        self.assertIn("read", profiler.phase_totals)
+
+    def test_page_records_phases(self):
+        profiler = BuildProfiler()
+        with profiler.page("page.md"):
+            with profiler.phase("render"):
+                pass
+        with profiler.phase("outside"):
+            pass
+        self.assertEqual(len(profiler.pages), 1)
+        record = profiler.pages[0]
+        self.assertEqual(record["page"], "page.md")
+        self.assertEqual(list(record["phases"]), ["render"])
+        self.assertGreaterEqual(record["seconds"], record["phases"]["render"])
+
+    def test_page_is_recorded_on_failure(self):
+        profiler = BuildProfiler()
+        with self.assertRaises(ValueError):
+            with profiler.page("broken.md"):
+                raise ValueError("broken")
+        self.assertEqual(profiler.pages[0]["page"], "broken.md")
+
+    def test_add_page(self):
+        profiler = BuildProfiler()
+        profiler.add_page({"page": "a.md", "pid": 1, "start": profiler.origin, "seconds": 0.5,
+                           "phases": {"write": 0.25}})
+        profiler.add_page({"page": "b.md", "pid": 2, "start": profiler.origin, "seconds": 1.0,
+                           "phases": {"write": 0.5}})
+        self.assertEqual(profiler.phase_totals, {"write": 0.75})
+        self.assertEqual([record["page"] for record in profiler.sorted_pages()], ["b.md", "a.md"])
+        report = profiler.report(top=1)
+        self.assertIn("b.md", report)
+        self.assertNotIn("a.md", report)
+
+    def test_json_and_trace(self):
+        profiler = BuildProfiler()
+        with profiler.phase("static copy"):
+            pass
+        with profiler.page("page.md"):
+            with profiler.phase("write"):
+                pass
+        data = json.loads(json.dumps(profiler.to_json()))
+        self.assertEqual(set(data["phases"]), {"static copy", "write"})
+        self.assertEqual(data["pages"][0]["page"], "page.md")
+
+        events = profiler.to_chrome_trace()["traceEvents"]
+        self.assertEqual([event["name"] for event in events], ["static copy", "page.md"])
+        self.assertTrue(all(event["ph"] == "X" for event in events))
+        self.assertIn("write", events[1]["args"])
+
+
+class TestProfiledBuild(unittest.TestCase):
+    def test_profiled_output_is_identical(self):
+        markdown = "# Title\n\nSome **bold** text\n\n- a\n- b"
+        profiler = BuildProfiler()
+        html = "".join(iter_markdown_html(markdown.split("\n"), "/", profiler=profiler))
+        self.assertEqual(html, markdown_to_html_node(markdown).to_html())
+        self.assertEqual(set(profiler.phase_totals), {"block split", "inline parse", "serialize"})
+
+    def test_pages_are_profiled(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            content_dir = os.path.join(tmp_dir, "content")
+            template_path = os.path.join(tmp_dir, "template.html")
+            os.makedirs(content_dir)
+            with open(template_path, "w", encoding="utf-8") as f:
+                f.write("{{ Title }}{{ Content }}")
+            for name in ("a", "b"):
+                with open(os.path.join(content_dir, f"{name}.md"), "w", encoding="utf-8") as f:
+                    f.write(f"# Page {name}\n\nText")
+
+            for jobs in (1, 2):
+                profiler = BuildProfiler()
+                generate_pages_recursive(
+                    content_dir, template_path, os.path.join(tmp_dir, "docs"), "/", None, jobs,
+                    profiler=profiler,
+                )
+                self.assertEqual(
+                    sorted(os.path.basename(record["page"]) for record in profiler.pages), ["a.md", "b.md"]
+                )
+                self.assertEqual(
+                    set(profiler.phase_totals),
+                    {"scan", "read", "block split", "inline parse", "serialize", "template", "write"},
+                )
+        finally:
+            shutil.rmtree(tmp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -391,6 +391,26 @@ class TestSplitNodesLink(unittest.TestCase):
             new_nodes,
         )
 
+    def test_split_links_many(self):
+        text = " ".join(f"[link{i}](url{i})" for i in range(2000))
+        new_nodes = split_nodes_link([TextNode(text, TextType.TEXT)])
+        self.assertEqual(len(new_nodes), 3999)
+        self.assertEqual(new_nodes[0], TextNode("link0", TextType.LINK, "url0"))
+        self.assertEqual(new_nodes[1], TextNode(" ", TextType.TEXT))
+        self.assertEqual(new_nodes[-1], TextNode("link1999", TextType.LINK, "url1999"))
+
+    def test_split_links_repeated_identical(self):
+        node = TextNode("[a](b) and [a](b)", TextType.TEXT)
+        new_nodes = split_nodes_link([node])
+        self.assertListEqual(
+            [
+                TextNode("a", TextType.LINK, "b"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("a", TextType.LINK, "b"),
+            ],
+            new_nodes,
+        )
+
 
 class TestTextToTextNodes(unittest.TestCase):
     def test_text_to_textnodes(self):
@@ -507,6 +527,95 @@ class TestTextToTextNodes(unittest.TestCase):
             nodes,
         )
 
+    def test_text_to_textnodes_underscore_italic(self):
+        nodes = text_to_textnodes("An _italic_ word")
+        self.assertListEqual(
+            [
+                TextNode("An ", TextType.TEXT),
+                TextNode("italic", TextType.ITALIC),
+                TextNode(" word", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_delimiters_inside_code(self):
+        nodes = text_to_textnodes("Run `a * b_c` now")
+        self.assertListEqual(
+            [
+                TextNode("Run ", TextType.TEXT),
+                TextNode("a * b_c", TextType.CODE),
+                TextNode(" now", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_underscore_in_link_url(self):
+        nodes = text_to_textnodes("See [docs](https://example.com/a_b_c)")
+        self.assertListEqual(
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("docs", TextType.LINK, "https://example.com/a_b_c"),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_linked_image(self):
+        # The image wins, as it did when images were split before links
+        nodes = text_to_textnodes("[![build](/badge.png)](/ci)")
+        self.assertListEqual(
+            [
+                TextNode("[", TextType.TEXT),
+                TextNode("build", TextType.IMAGE, "/badge.png"),
+                TextNode("](/ci)", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_bracket_before_image(self):
+        nodes = text_to_textnodes("Options [draft ![logo](/logo.png)")
+        self.assertListEqual(
+            [
+                TextNode("Options [draft ", TextType.TEXT),
+                TextNode("logo", TextType.IMAGE, "/logo.png"),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_link_does_not_swallow_delimiters(self):
+        nodes = text_to_textnodes("[(_![i](/p.png)_a ")
+        self.assertListEqual(
+            [
+                TextNode("[(", TextType.TEXT),
+                TextNode("![i](/p.png)", TextType.ITALIC),
+                TextNode("a ", TextType.TEXT),
+            ],
+            nodes,
+        )
+        nodes = text_to_textnodes("[**bold** link](/u)")
+        self.assertListEqual(
+            [
+                TextNode("[", TextType.TEXT),
+                TextNode("bold", TextType.BOLD),
+                TextNode(" link](/u)", TextType.TEXT),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_bracket_in_link_text(self):
+        nodes = text_to_textnodes("See [[l](/u)")
+        self.assertListEqual(
+            [
+                TextNode("See ", TextType.TEXT),
+                TextNode("[l", TextType.LINK, "/u"),
+            ],
+            nodes,
+        )
+
+    def test_text_to_textnodes_unclosed_raises_error(self):
+        for text in ["Unclosed **bold", "Unclosed *italic", "Unclosed `code", "Unclosed _italic"]:
+            with self.assertRaises(ValueError):
+                text_to_textnodes(text)
+
 
 if __name__ == "__main__":
     unittest.main()
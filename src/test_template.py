@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+
+from copy_static import AssetMap
+from template import Template, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_split_into_literals_and_slots(self):
+        template = Template("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.assertEqual(template.literals, ["<title>", "</title><body>", "</body>"])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}")
+        html = template.render({"Title": "Hello", "Content": "<p>Body</p>"})
+        self.assertEqual(html, "<h1>Hello</h1><p>Body</p>")
+
+    def test_render_extra_variables(self):
+        template = Template("<p>{{ Author }} on {{Date}}</p>")
+        html = template.render({"Author": "Tolkien", "Date": "1954"})
+        self.assertEqual(html, "<p>Tolkien on 1954</p>")
+
+    def test_render_repeated_slot(self):
+        template = Template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render({"Title": "x"}), "x|x")
+
+    def test_render_streamed_value(self):
+        template = Template("<main>{{ Content }}</main><aside>{{ Content }}</aside>")
+        html = template.render({"Content": lambda: iter(["<p>", "a", "</p>"])})
+        self.assertEqual(html, "<main><p>a</p></main><aside><p>a</p></aside>")
+
+    def test_render_missing_value_is_left_as_written(self):
+        template = Template("{{ Title }}<p>{{Missing}}</p>{{ user.name }}")
+        self.assertEqual(template.render({"Title": "x"}), "x<p>{{Missing}}</p>{{ user.name }}")
+
+    def test_no_slots(self):
+        template = Template("<p>static</p>")
+        self.assertEqual(template.render({}), "<p>static</p>")
+
+    def test_basepath_rewrites_literals_only(self):
+        template = Template('<link href="/index.css" /><img src="/a.png" />{{ Content }}', "/site/")
+        html = template.render({"Content": '<a href="/x">x</a>'})
+        self.assertEqual(
+            html,
+            '<link href="/site/index.css" /><img src="/site/a.png" /><a href="/x">x</a>',
+        )
+
+    def test_asset_map_rewrites_literals_only(self):
+        asset_map = AssetMap({"/index.css": "/index.0123456789.css", "/a.png": "/a.abcdef0123.png"})
+        template = Template('<link href="/index.css" /><img src="/b.png" />{{ Content }}', "/site/", asset_map)
+        self.assertEqual(
+            template.render({"Content": '<img src="/site/a.png">'}),
+            '<link href="/site/index.0123456789.css" /><img src="/site/b.png" /><img src="/site/a.png">',
+        )
+
+    def test_asset_map_changes_digest(self):
+        source = '<link href="/index.css" />'
+        self.assertEqual(Template(source).digest, Template(source, asset_map=AssetMap()).digest)
+        self.assertNotEqual(
+            Template(source).digest, Template(source, asset_map=AssetMap({"/index.css": "/index.0123456789.css"})).digest
+        )
+
+    def test_write(self):
+        template = Template("<h1>{{ Title }}</h1>")
+        out = StringIO()
+        template.write(out, {"Title": "Hi"})
+        self.assertEqual(out.getvalue(), "<h1>Hi</h1>")
+
+
+class TestLoadTemplate(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.template_path = os.path.join(self.tmp_dir, "template.html")
+        with open(self.template_path, "w", encoding="utf-8") as f:
+            f.write("<h1>{{ Title }}</h1>")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_cached_while_unchanged(self):
+        self.assertIs(load_template(self.template_path), load_template(self.template_path))
+
+    def test_cached_per_basepath(self):
+        self.assertIsNot(load_template(self.template_path), load_template(self.template_path, "/site/"))
+
+    def test_cached_per_asset_map(self):
+        asset_map = AssetMap({"/index.css": "/index.0123456789.css"})
+        self.assertIs(
+            load_template(self.template_path, "/", asset_map), load_template(self.template_path, "/", AssetMap(asset_map))
+        )
+        self.assertIsNot(load_template(self.template_path), load_template(self.template_path, "/", asset_map))
+
+    def test_reloaded_when_changed(self):
+        first = load_template(self.template_path)
+        with open(self.template_path, "w", encoding="utf-8") as f:
+            f.write("<h2>{{ Title }}</h2>!")
+        second = load_template(self.template_path)
+        self.assertEqual(second.render({"Title": "x"}), "<h2>x</h2>!")
+        self.assertNotEqual(first.digest, second.digest)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -72,6 +72,22 @@ class TestTextToHTML(unittest.TestCase):
         html_img = text_node_to_html_node(img_node)
         self.assertEqual(html_img.to_html(), '<img src="cat.jpg" alt="A cat"></img>')
 
+    def test_link_basepath(self):
+        node = TextNode("Contact", TextType.LINK, "/contact")
+        html_node = text_node_to_html_node(node, "/site/")
+        self.assertEqual(html_node.props, {"href": "/site/contact"})
+
+    def test_image_basepath(self):
+        node = TextNode("Tom", TextType.IMAGE, "/images/tom.png")
+        html_node = text_node_to_html_node(node, "/site")
+        self.assertEqual(html_node.props, {"src": "/site/images/tom.png", "alt": "Tom"})
+
+    def test_basepath_leaves_other_urls_alone(self):
+        for url in ["https://boot.dev", "relative/page", "//cdn.example.com/x.png", None]:
+            node = TextNode("Link", TextType.LINK, url)
+            html_node = text_node_to_html_node(node, "/site/")
+            self.assertEqual(html_node.props, {"href": url})
+
 
 if __name__ == "__main__":
     unittest.main()
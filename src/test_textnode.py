@@ -39,6 +39,12 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.TEXT, "https://www.boot.dev")
         self.assertNotEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertFalse(hasattr(node, "__dict__"))
+        with self.assertRaises(AttributeError):
+            node.extra = "not allowed"
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -2,18 +2,44 @@ from textnode import TextNode, TextType
 from htmlnode import LeafNode
 
 
-def text_node_to_html_node(text_node):
+def apply_basepath(url, basepath="/", asset_map=None):
+    """
+    Prefix a site-absolute URL ("/path") with the base path.
+    
+    Relative, external and protocol-relative ("//host") URLs are returned
+    unchanged. A URL in asset_map is first replaced by its fingerprinted URL.
+    """
+    if asset_map:
+        url = asset_map.get(url, url)
+    if basepath == "/" or not url or not url.startswith("/") or url.startswith("//"):
+        return url
+    # Remove trailing slash from basepath to avoid double slashes
+    return basepath.rstrip("/") + url
+
+
+def text_node_to_leaf_args(text_node, basepath="/", asset_map=None):
+    """
+    Return the (tag, value, props) of the leaf element for a TextNode.
+    
+    Shared by text_node_to_html_node and the HTMLDocument emitters, which
+    take the parts without building a LeafNode.
+    """
     if text_node.text_type == TextType.TEXT:
-        return LeafNode(None, text_node.text)
+        return None, text_node.text, None
     elif text_node.text_type == TextType.BOLD:
-        return LeafNode("b", text_node.text)
+        return "b", text_node.text, None
     elif text_node.text_type == TextType.ITALIC:
-        return LeafNode("i", text_node.text)
+        return "i", text_node.text, None
     elif text_node.text_type == TextType.CODE:
-        return LeafNode("code", text_node.text)
+        return "code", text_node.text, None
     elif text_node.text_type == TextType.LINK:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
+        return "a", text_node.text, {"href": apply_basepath(text_node.url, basepath, asset_map)}
     elif text_node.text_type == TextType.IMAGE:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+        return "img", "", {"src": apply_basepath(text_node.url, basepath, asset_map), "alt": text_node.text}
     else:
         raise ValueError(f"Invalid text type: {text_node.text_type}")
+
+
+def text_node_to_html_node(text_node, basepath="/", asset_map=None):
+    tag, value, props = text_node_to_leaf_args(text_node, basepath, asset_map)
+    return LeafNode(tag, value, props)